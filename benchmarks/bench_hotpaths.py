@@ -0,0 +1,235 @@
+"""Бенчмарк основных операций: загрузка, статистика, корреляции, графики.
+
+Для каждого размера синтетического набора (benchmarks/synthetic.py) замеряет
+время и пиковую память операций, которые выполняют вкладки приложения.
+Пиковая память (peak_mb) - только куча Python и numpy (tracemalloc): буферы
+C-парсера pandas и pyarrow в неё не попадают. Поэтому для загрузки CSV
+дополнительно замеряется прирост пикового RSS (rss_mb) в отдельном процессе.
+Графики рисуются на Agg без окна. Результат сохраняется в JSON; с --compare
+новый замер сравнивается с сохранённым ранее.
+
+Пример:
+    python benchmarks/bench_hotpaths.py --sizes 50k 1M --output base.json
+    python benchmarks/bench_hotpaths.py --sizes 50k 1M --compare base.json
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from synthetic import ensure_csv
+from utils.analysis import DatasetAnalysis
+from utils.decimate import minmax_decimate
+from utils.io import load_dataframe
+from utils.plots import (draw_heatmap, draw_density, draw_histogram, draw_trend,
+                         DENSITY_THRESHOLD, DENSITY_BINS)
+from utils.report import new_figure
+
+DEFAULT_SIZES = ['50k', '1M', '10M']
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data')
+# Во сколько раз операция может замедлиться, прежде чем считаться регрессией
+REGRESSION_RATIO = 1.2
+
+
+def parse_size(text):
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    text = text.strip().lower()
+    if text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def render_scatter(df, x='carat', y='price'):
+    analysis = DatasetAnalysis(df)
+    figure = new_figure()
+    ax = figure.add_subplot(111)
+    if len(df) > DENSITY_THRESHOLD:
+        counts, extent = analysis.density_grid(x, y, bins=DENSITY_BINS)
+        draw_density(figure, ax, counts, extent)
+    else:
+        ax.scatter(df[x], df[y], alpha=0.5, s=10)
+    draw_trend(ax, analysis.regression(x, y))
+    figure.canvas.draw()
+
+
+def render_line(df, x='carat', y='price'):
+    analysis = DatasetAnalysis(df)
+    order = analysis.sort_order(x)
+    xs = df[x].to_numpy(dtype=np.float64)[order]
+    ys = df[y].to_numpy(dtype=np.float64)[order]
+    figure = new_figure()
+    ax = figure.add_subplot(111)
+    ax.plot(*minmax_decimate(xs, ys, xs[0], xs[-1], int(ax.bbox.width)), 'b-', alpha=0.7)
+    figure.canvas.draw()
+
+
+def render_histogram(analysis, column='price'):
+    # Как во вкладке: номера интервалов закэшированы в анализе, на запуск -
+    # только частоты и отрисовка
+    counts, edges = analysis.histogram(column, bins=30)
+    figure = new_figure()
+    draw_histogram(figure.add_subplot(111), counts, edges)
+    figure.canvas.draw()
+
+
+def render_heatmap(df):
+    figure = new_figure()
+    draw_heatmap(figure.add_subplot(111), DatasetAnalysis(df).correlation('pearson').matrix)
+    figure.tight_layout()
+    figure.canvas.draw()
+
+
+def operations(csv_path, df):
+    histogram_analysis = DatasetAnalysis(df)
+    return {
+        'load_csv': lambda: load_dataframe(csv_path),
+        'describe': lambda: DatasetAnalysis(df).describe(),
+        'corr': lambda: DatasetAnalysis(df).correlation('pearson'),
+        'nunique': lambda: df.nunique(),
+        'render_scatter': lambda: render_scatter(df),
+        'render_line': lambda: render_line(df),
+        'render_histogram': lambda: render_histogram(histogram_analysis),
+        'render_heatmap': lambda: render_heatmap(df),
+    }
+
+
+def measure(func, repeat):
+    """Лучшее время из repeat запусков и пиковая память отдельного запуска"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mb': peak / 1024 / 1024}
+
+
+def peak_rss():
+    """Пиковый RSS текущего процесса в байтах; None, если узнать нельзя"""
+    # VmHWM в Linux сбрасывается при exec, а ru_maxrss наследует пик родителя
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss - в килобайтах, на macOS - в байтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def _load_rss_delta(csv_path):
+    """Прирост пикового RSS за загрузку - выполняется в отдельном процессе"""
+    before = peak_rss()
+    load_dataframe(csv_path)
+    after = peak_rss()
+    return None if before is None else after - before
+
+
+def measure_load_rss(csv_path):
+    """Память загрузки целиком, вместе с C-парсером и pyarrow (MB или None)"""
+    # Новый процесс, чтобы пик с уже загруженными данными бенчмарка не закрывал пик загрузки
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        delta = pool.apply(_load_rss_delta, (csv_path,))
+    return None if delta is None else delta / 1024 / 1024
+
+
+def compare(current, baseline, ratio=REGRESSION_RATIO):
+    """Печатает сравнение с базовым замером; возвращает число регрессий"""
+    regressions = 0
+    print(f"\n{'размер':>10} {'операция':<18} {'было, с':>10} {'стало, с':>10} {'x':>6}")
+    for size, ops in current['results'].items():
+        for name, result in ops.items():
+            old = baseline.get('results', {}).get(size, {}).get(name)
+            if not old:
+                continue
+            change = result['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+            mark = ''
+            if change > ratio:
+                mark = ' ⚠ регрессия'
+                regressions += 1
+            print(f"{size:>10} {name:<18} {old['seconds']:>10.4f} {result['seconds']:>10.4f} "
+                  f"{change:>6.2f}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк основных операций')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='размеры наборов: 50k, 1M, 10M ...')
+    parser.add_argument('--only', nargs='+', help='замерить только эти операции')
+    parser.add_argument('--repeat', type=int, default=3, help='запусков на замер времени')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='папка для синтетических CSV')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results.json'))
+    parser.add_argument('--compare', help='JSON предыдущего замера для сравнения')
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__,
+        },
+        'results': {},
+    }
+
+    for size_text in args.sizes:
+        rows = parse_size(size_text)
+        print(f"== {rows} строк ==")
+        csv_path = ensure_csv(rows, args.data_dir)
+        df = load_dataframe(csv_path)
+        results = report['results'][str(rows)] = {}
+        for name, func in operations(csv_path, df).items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(func, args.repeat)
+            line = (f"  {name:<18} {results[name]['seconds']:>9.4f} с  "
+                    f"пик Python {results[name]['peak_mb']:>9.1f} MB")
+            if name == 'load_csv':
+                results[name]['rss_mb'] = measure_load_rss(csv_path)
+                if results[name]['rss_mb'] is not None:
+                    line += f"  RSS +{results[name]['rss_mb']:.1f} MB"
+            print(line)
+        del df
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результат сохранён в {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
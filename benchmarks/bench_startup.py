@@ -0,0 +1,112 @@
+"""Бенчмарк запуска: время от старта до первой отрисовки главного окна.
+
+Каждый замер выполняется в отдельном процессе, чтобы импорты не брались из
+уже заполненного sys.modules. Скрипт завершается с кодом 1, если медиана
+превышает бюджет или до первой отрисовки загружен кто-то из тяжёлых модулей
+(HEAVY_MODULES), поэтому его можно запускать в CI.
+
+Пример:
+    python benchmarks/bench_startup.py --runs 5 --budget 0.5 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет времени до первой отрисовки окна, секунды
+STARTUP_BUDGET_S = 0.5
+
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'scipy', 'pyarrow']
+
+CHILD_SCRIPT = r'''
+import time
+start = time.perf_counter()
+
+import json
+import sys
+
+sys.path.insert(0, sys.argv[1])
+import main
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QEvent
+
+app = QApplication(sys.argv[:1])
+app.setStyle('Fusion')
+window = main.DiamondApp()
+
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and getattr(obj, 'window', None) and obj.window() is window:
+            print(json.dumps({
+                'seconds': time.perf_counter() - start,
+                'modules': [name for name in sys.argv[2].split(',') if name in sys.modules],
+            }))
+            sys.stdout.flush()
+            app.quit()
+            app.removeEventFilter(self)
+        return False
+
+
+first_paint = FirstPaint()
+app.installEventFilter(first_paint)
+window.show()
+app.exec_()
+'''
+
+
+def measure_once(env):
+    # Запускаем из пустой папки, чтобы автозагрузка diamonds.csv не влияла на замер
+    result = subprocess.run([sys.executable, '-c', CHILD_SCRIPT, ROOT, ','.join(HEAVY_MODULES)],
+                            capture_output=True, text=True, env=env,
+                            cwd=os.path.join(ROOT, 'benchmarks'), timeout=120)
+    for line in result.stdout.splitlines():
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"Окно не отрисовалось:\n{result.stderr}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Время до первой отрисовки окна')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_S,
+                        help=f'бюджет в секундах (по умолчанию {STARTUP_BUDGET_S})')
+    parser.add_argument('--json', help='сохранить результат в JSON файл')
+    parser.add_argument('--platform', default='offscreen',
+                        help='QT_QPA_PLATFORM для замера (offscreen работает без дисплея)')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, QT_QPA_PLATFORM=args.platform)
+    runs = [measure_once(env) for _ in range(args.runs)]
+    seconds = [run['seconds'] for run in runs]
+    median = statistics.median(seconds)
+
+    result = {
+        'benchmark': 'startup_first_paint',
+        'runs': seconds,
+        'median_s': median,
+        'budget_s': args.budget,
+        'modules_at_first_paint': runs[-1]['modules'],
+        'within_budget': median <= args.budget,
+    }
+    # Тяжёлый модуль до отрисовки - регрессия, даже если по времени бюджет ещё не превышен
+    result['passed'] = result['within_budget'] and not result['modules_at_first_paint']
+    print(f"Первая отрисовка окна: медиана {median:.3f} с (бюджет {args.budget:.2f} с)")
+    print(f"Загружено до отрисовки: {', '.join(result['modules_at_first_paint']) or 'ничего из тяжелых'}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if not result['within_budget']:
+        print(f"ОШИБКА: медиана {median:.3f} с превышает бюджет {args.budget:.2f} с")
+    if result['modules_at_first_paint']:
+        print("ОШИБКА: тяжёлые модули должны загружаться после первой отрисовки")
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Генератор синтетических данных с теми же колонками, что и diamonds.csv.
+
+Распределения подобраны по настоящему diamonds.csv: доли категорий,
+логнормальный вес, размеры и цена, зависящие от веса.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+CUT_FREQ = {'Ideal': 0.40, 'Premium': 0.256, 'Very Good': 0.224, 'Good': 0.091, 'Fair': 0.029}
+COLOR_FREQ = {'G': 0.209, 'E': 0.182, 'F': 0.177, 'H': 0.154, 'D': 0.126, 'I': 0.101, 'J': 0.051}
+CLARITY_FREQ = {'SI1': 0.242, 'VS2': 0.227, 'SI2': 0.17, 'VS1': 0.151, 'VVS2': 0.094,
+                'VVS1': 0.068, 'IF': 0.034, 'I1': 0.014}
+
+COLUMNS = ['carat', 'cut', 'color', 'clarity', 'depth', 'table', 'x', 'y', 'z', 'price']
+
+
+def _choice(rng, frequencies, rows):
+    values = np.array(list(frequencies))
+    probabilities = np.array(list(frequencies.values()))
+    return values[rng.choice(len(values), size=rows, p=probabilities / probabilities.sum())]
+
+
+def make_diamonds(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    carat = np.clip(np.exp(rng.normal(-0.395, 0.585, rows)), 0.2, 5.01).round(2)
+    x = (np.exp(1.858) * carat ** 0.3306 * rng.normal(1, 0.01, rows)).round(2)
+    y = (x * rng.normal(1, 0.005, rows)).round(2)
+    depth = rng.normal(61.75, 1.43, rows).round(1)
+    z = (depth / 100 * (x + y) / 2).round(2)
+    price = np.clip(np.exp(8.449 + 1.676 * np.log(carat) + rng.normal(0, 0.263, rows)),
+                    326, 18823).astype(np.int64)
+
+    return pd.DataFrame({
+        'carat': carat,
+        'cut': _choice(rng, CUT_FREQ, rows),
+        'color': _choice(rng, COLOR_FREQ, rows),
+        'clarity': _choice(rng, CLARITY_FREQ, rows),
+        'depth': depth,
+        'table': rng.normal(57.46, 2.23, rows).round(0),
+        'x': x,
+        'y': y,
+        'z': z,
+        'price': price,
+    }, columns=COLUMNS)
+
+
+def ensure_csv(rows, data_dir, seed=0, chunk_rows=1_000_000):
+    """Возвращает путь к CSV нужного размера, создавая его при отсутствии"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'diamonds_{rows}.csv')
+    if os.path.exists(path):
+        return path
+
+    tmp_path = path + '.tmp'
+    # Пишем порциями, чтобы генерация 10M строк не требовала всей таблицы в памяти
+    for part, start in enumerate(range(0, rows, chunk_rows)):
+        chunk = make_diamonds(min(chunk_rows, rows - start), seed=seed + part)
+        chunk.to_csv(tmp_path, index=False, mode='w' if part == 0 else 'a', header=(part == 0))
+    os.replace(tmp_path, path)
+    return path
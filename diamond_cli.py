@@ -0,0 +1,150 @@
+"""Пакетный режим без графического интерфейса.
+
+Считает статистику, корреляционную матрицу, самые сильные корреляции и
+регрессии для одного или нескольких файлов и сохраняет отчёты в CSV/JSON
+и графики в PNG. Qt не используется, поэтому скрипт работает на серверах
+без дисплея. Папка отчёта файла - его путь относительно общей папки всех
+входных файлов (a/diamonds.csv и b/diamonds.csv -> reports/a/diamonds и
+reports/b/diamonds), так что одноимённые файлы не перезаписывают друг друга.
+
+С ключом --batch файлы (папки, шаблоны вида 'exports/*.csv') обрабатываются
+параллельно в пуле процессов, а результат сводится в один сравнительный
+отчёт batch_summary / batch_correlations.
+
+С ключом --to-columns файлы переводятся в папки колонок .npy
+(utils.column_store); такие папки можно передавать вместо файлов - они
+открываются отображением в память без разбора CSV.
+
+Пример:
+    python diamond_cli.py diamonds.csv -o reports --pair carat:price
+    python diamond_cli.py --batch exports/ --workers 8 -o reports
+    python diamond_cli.py exports/*.csv --to-columns stores/
+"""
+import argparse
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+from utils.batch import expand_inputs, file_labels, run_batch, comparative_report
+from utils.column_store import write_column_store
+from utils.io import CHUNK_SIZE, load_dataframe
+from utils.report import analyze, write_tables, render_figures
+
+
+def parse_pair(text):
+    if ':' not in text:
+        raise argparse.ArgumentTypeError(f"Ожидается формат X:Y, получено '{text}'")
+    x, y = text.split(':', 1)
+    return x, y
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Анализ данных о бриллиантах без GUI')
+    parser.add_argument('files', nargs='+',
+                        help='CSV или Excel файлы для анализа (с --batch - также папки и шаблоны)')
+    parser.add_argument('-o', '--output', default='reports',
+                        help='папка для отчётов (по умолчанию reports)')
+    parser.add_argument('--format', nargs='+', choices=['csv', 'json'], default=['csv', 'json'],
+                        help='форматы таблиц')
+    parser.add_argument('--pair', action='append', type=parse_pair, dest='pairs',
+                        help='пара X:Y для регрессии (можно указать несколько раз); '
+                             'по умолчанию - каждая числовая колонка против price')
+    parser.add_argument('--top', type=int, default=3, help='сколько сильнейших корреляций выводить')
+    parser.add_argument('--cmap', default='coolwarm', help='цветовая схема тепловой карты')
+    parser.add_argument('--no-plots', action='store_true', help='не рисовать PNG')
+    parser.add_argument('--batch', action='store_true',
+                        help='параллельный потоковый анализ многих файлов со сводным отчётом')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='число процессов для --batch (по умолчанию - число ядер)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help='строк в порции при потоковом чтении (ограничивает память процесса)')
+    parser.add_argument('--to-columns', metavar='DIR',
+                        help='только сохранить файлы как папки колонок .npy в DIR')
+    return parser
+
+
+def run_file(file_path, args, label=None):
+    """label - путь файла относительно общей папки всех входных файлов (batch.file_labels)"""
+    df = load_dataframe(file_path)
+    analysis, tables = analyze(df, pairs=args.pairs, top=args.top)
+
+    # Одноимённые файлы из разных папок получают разные папки отчёта
+    label = label or os.path.basename(file_path)
+    out_dir = os.path.join(args.output, os.path.splitext(label)[0])
+    meta = {'file': os.path.abspath(file_path), 'rows': len(df), 'columns': len(df.columns)}
+    written = write_tables(tables, out_dir, formats=args.format, meta=meta)
+    if not args.no_plots:
+        written += render_figures(analysis, out_dir, pairs=args.pairs, cmap=args.cmap)
+    return df, tables, written
+
+
+def run_batch_mode(args):
+    files = expand_inputs(args.files)
+    if not files:
+        print("❌ Не найдено ни одного CSV/Excel файла", file=sys.stderr)
+        return 1
+
+    def on_result(summary, path, error):
+        if error:
+            print(f"❌ {path}: {error}", file=sys.stderr)
+        else:
+            print(f"✅ {path}: {summary['rows']} строк")
+
+    print(f"Файлов: {len(files)}, процессов: {args.workers or os.cpu_count()}")
+    summaries, errors = run_batch(files, workers=args.workers, chunksize=args.chunksize,
+                                  top=args.top, on_result=on_result)
+    tables = comparative_report(summaries)
+    meta = {'files': len(files), 'processed': len(summaries), 'errors': errors}
+    written = write_tables({f'batch_{name}': frame for name, frame in tables.items()},
+                           args.output, formats=args.format, meta=meta,
+                           json_name='batch_report.json')
+    print(f"Сводный отчёт: {', '.join(written)}")
+    return 1 if errors else 0
+
+
+def run_convert_mode(args):
+    failed = 0
+    files = expand_inputs(args.files)
+    labels = file_labels(files)
+    for file_path in files:
+        name = os.path.splitext(labels[file_path])[0]
+        store_dir = os.path.join(args.to_columns, name + '.columns')
+        try:
+            df = load_dataframe(file_path, chunksize=args.chunksize)
+            write_column_store(df, store_dir)
+        except Exception as e:
+            print(f"❌ {file_path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"✅ {file_path} → {store_dir} ({len(df)} строк)")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.to_columns:
+        return run_convert_mode(args)
+    if args.batch:
+        return run_batch_mode(args)
+
+    failed = 0
+    labels = file_labels(args.files)
+    for file_path in args.files:
+        try:
+            df, tables, written = run_file(file_path, args, labels[file_path])
+        except Exception as e:
+            print(f"❌ {file_path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+
+        print(f"✅ {file_path}: {len(df)} строк, файлов отчёта: {len(written)}")
+        for row in tables['top_correlations'].itertuples(index=False):
+            print(f"   • {row.var1} & {row.var2}: {row.r:.3f}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
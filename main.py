@@ -1,25 +1,42 @@
+import logging
 import os
 import sys
 
 # Указываем правильный путь к плагинам Qt
 os.environ['QT_QPA_PLATFORM_PLUGIN_PATH'] = r'C:\Users\Солнце\AppData\Local\Programs\Python\Python312\Lib\site-packages\PyQt5\Qt5\plugins'
 
-import pandas as pd
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QVBoxLayout, 
-                           QWidget, QMessageBox, QFileDialog, QStatusBar)
-from PyQt5.QtCore import QTimer
+                           QWidget, QMessageBox, QFileDialog, QStatusBar,
+                           QProgressBar, QPushButton)
+from PyQt5.QtCore import QTimer, QFileSystemWatcher
 
-# Импорты наших кастомных вкладок
-from widgets.stat_tab import StatTab
-from widgets.correlation_tab import CorrelationTab
-from widgets.heatmap_tab import HeatmapTab
-from widgets.linear_tab import LinearTab
+# Вкладки с данными импортируются при первом показе (см. LazyTab), как и
+# загрузчик с pandas - так окно появляется, не дожидаясь тяжелых библиотек
+from widgets.filter_panel import FilterPanel
+from widgets.lazy_tab import LazyTab
 from widgets.log_tab import LogTab
+from utils.cache import ColumnarCache
+
+# Пауза после изменения файла перед чтением дописанного (мс): запись идет
+# порциями, и несколько уведомлений подряд читаются за один раз
+WATCH_DELAY_MS = 500
 
 class DiamondApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.df = None  # Здесь будут храниться наши данные
+        self.loader = None  # Фоновый поток загрузки
+        self.auto_load = False
+        self.data_cache = ColumnarCache()  # Колоночный кэш для CSV
+        self.analysis = None  # Общие вычисления для всех вкладок (DatasetAnalysis)
+        self.filtered = None  # DatasetAnalysis строк, прошедших фильтр (None - фильтра нет)
+        self.dirty_tabs = set()  # Вкладки, которые ещё не видели новые данные
+        self.tail = None  # Чтение дописанных строк (utils.tail.CsvTail) в режиме слежения
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.onWatchedFileChanged)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.timeout.connect(self.appendNewRows)
         self.initUI()
         
     def initUI(self):
@@ -31,14 +48,20 @@ class DiamondApp(QMainWindow):
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
         
+        # Общий фильтр строк - его результат видят все вкладки
+        self.filter_panel = FilterPanel()
+        self.filter_panel.filter_changed.connect(self.onFilterChanged)
+        layout.addWidget(self.filter_panel)
+        
         # Создаем вкладки
         self.tabs = QTabWidget()
         
         # Создаем экземпляры наших вкладок
-        self.stat_tab = StatTab()
-        self.correlation_tab = CorrelationTab()
-        self.heatmap_tab = HeatmapTab()
-        self.linear_tab = LinearTab()
+        self.stat_tab = LazyTab('widgets.stat_tab', 'StatTab')
+        self.correlation_tab = LazyTab('widgets.correlation_tab', 'CorrelationTab')
+        self.heatmap_tab = LazyTab('widgets.heatmap_tab', 'HeatmapTab')
+        self.linear_tab = LazyTab('widgets.linear_tab', 'LinearTab')
+        self.pivot_tab = LazyTab('widgets.pivot_tab', 'PivotTab')
         self.log_tab = LogTab()
         
         # Добавляем вкладки
@@ -46,8 +69,12 @@ class DiamondApp(QMainWindow):
         self.tabs.addTab(self.correlation_tab, "📈 Графики корреляции")
         self.tabs.addTab(self.heatmap_tab, "🎨 Тепловая карта")
         self.tabs.addTab(self.linear_tab, "📉 Линейные графики")
+        self.tabs.addTab(self.pivot_tab, "🧮 Сводная таблица")
         self.tabs.addTab(self.log_tab, "📝 Лог действий")
         
+        # Вкладки считают данные только когда становятся видимыми
+        self.tabs.currentChanged.connect(self.onTabChanged)
+        
         layout.addWidget(self.tabs)
         
         # Создаем статус бар
@@ -55,6 +82,18 @@ class DiamondApp(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Готов к работе. Загрузите данные через меню.")
         
+        # Прогресс загрузки и кнопка отмены (видны только во время загрузки)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        self.statusBar.addPermanentWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.clicked.connect(self.cancelLoading)
+        self.cancel_btn.hide()
+        self.statusBar.addPermanentWidget(self.cancel_btn)
+        
         # Создаем меню
         self.createMenu()
         
@@ -70,23 +109,28 @@ class DiamondApp(QMainWindow):
         load_action = file_menu.addAction('Загрузить данные')
         load_action.triggered.connect(self.loadData)
         
+        stream_action = file_menu.addAction('Потоковая статистика (большие файлы)...')
+        stream_action.triggered.connect(self.streamStats)
+        
+        self.cancel_action = file_menu.addAction('Отменить загрузку')
+        self.cancel_action.triggered.connect(self.cancelLoading)
+        self.cancel_action.setEnabled(False)
+        
+        self.watch_action = file_menu.addAction('Следить за дописыванием файла')
+        self.watch_action.setCheckable(True)
+        self.watch_action.toggled.connect(self.toggleWatch)
+        
+        clear_cache_action = file_menu.addAction('Очистить кэш данных')
+        clear_cache_action.triggered.connect(self.clearCache)
+        clear_cache_action.setEnabled(self.data_cache.available)
+        
         exit_action = file_menu.addAction('Выход')
         exit_action.triggered.connect(self.close)
     
     def autoLoadData(self):
         """Автоматически загружает diamonds.csv при запуске"""
         if os.path.exists('diamonds.csv'):
-            try:
-                self.df = pd.read_csv('diamonds.csv')
-                self.statusBar.showMessage(f"Данные загружены: {len(self.df)} записей")
-                self.log_tab.add_log("✅ Автоматически загружен файл diamonds.csv")
-                
-                # Передаем данные во все вкладки
-                self.updateAllTabs()
-                
-            except Exception as e:
-                self.statusBar.showMessage(f"Ошибка загрузки: {str(e)}")
-                self.log_tab.add_log(f"❌ Ошибка загрузки данных: {str(e)}")
+            self.startLoading('diamonds.csv', auto=True)
     
     def loadData(self):
         """Загрузка данных через диалог выбора файла"""
@@ -96,30 +140,230 @@ class DiamondApp(QMainWindow):
         )
         
         if file_path:
-            try:
-                if file_path.endswith('.csv'):
-                    self.df = pd.read_csv(file_path)
-                elif file_path.endswith('.xlsx'):
-                    self.df = pd.read_excel(file_path)
-                
-                self.statusBar.showMessage(f"Данные загружены: {len(self.df)} записей")
-                self.log_tab.add_log(f"✅ Загружен файл: {os.path.basename(file_path)}")
-                
-                # Обновляем все вкладки
-                self.updateAllTabs()
-                
-            except Exception as e:
-                QMessageBox.critical(self, 'Ошибка', f'Не удалось загрузить файл: {str(e)}')
-                self.log_tab.add_log(f"❌ Ошибка загрузки: {str(e)}")
+            self.startLoading(file_path)
+    
+    def streamStats(self):
+        """Статистика по большому CSV без загрузки его в память"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, 'Выберите большой CSV файл', '', 'CSV Files (*.csv)'
+        )
+        
+        if file_path:
+            from widgets.data_loader import StreamingStatsLoader
+            self.startWorker(StreamingStatsLoader(file_path, self), self.onStreamingStatsReady)
+    
+    def startLoading(self, file_path, auto=False):
+        """Запускает загрузку файла в фоновом потоке"""
+        from widgets.data_loader import DataLoader
+        self.startWorker(DataLoader(file_path, self.data_cache, self), self.onDataLoaded, auto)
+    
+    def startWorker(self, worker, on_loaded, auto=False):
+        """Запускает фоновый поток с прогрессом в статус баре и возможностью отмены"""
+        if self.loader is not None and self.loader.isRunning():
+            QMessageBox.warning(self, 'Загрузка', 'Дождитесь окончания текущей загрузки или отмените её')
+            return
+        
+        file_path = worker.file_path
+        self.auto_load = auto
+        self.loader = worker
+        self.loader.progress.connect(self.onLoadProgress)
+        self.loader.loaded.connect(on_loaded)
+        self.loader.failed.connect(self.onLoadFailed)
+        self.loader.cancelled.connect(self.onLoadCancelled)
+        self.loader.finished.connect(self.onLoaderFinished)
+        
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.cancel_btn.show()
+        self.cancel_action.setEnabled(True)
+        self.statusBar.showMessage(f"Загрузка {os.path.basename(file_path)}...")
+        self.loader.start()
+    
+    def cancelLoading(self):
+        if self.loader is not None and self.loader.isRunning():
+            self.loader.cancel()
+            self.statusBar.showMessage("Отмена загрузки...")
+    
+    def clearCache(self):
+        size_mb = self.data_cache.size() / 1024 / 1024
+        self.data_cache.clear()
+        self.log_tab.add_log(f"🗑 Кэш данных очищен ({size_mb:.1f} MB)")
+    
+    def onLoadProgress(self, percent):
+        self.progress_bar.setValue(percent)
+    
+    def onDataLoaded(self, df, file_path):
+        from utils.analysis import DatasetAnalysis
+        
+        self.df = df
+        if self.analysis is None:
+            self.analysis = DatasetAnalysis(df)
+        else:
+            self.analysis.set_data(df)
+        self.filtered = None
+        self.filter_panel.set_data(df)
+        if self.stat_tab.widget is not None:
+            # Выбор приближённого подсчёта относился к прошлому файлу
+            self.stat_tab.widget.reset_approx(len(df))
+        self.startTail(file_path, self.loader.file_size)
+        self.statusBar.showMessage(f"Данные загружены: {len(self.df)} записей")
+        if df.attrs.get('schema_warning'):
+            self.log_tab.add_log(f"⚠ Типы колонок определены автоматически: {df.attrs['schema_warning']}",
+                                 logging.WARNING)
+        if self.loader.from_cache:
+            self.log_tab.add_log("⚡ Данные прочитаны из кэша")
+        if self.auto_load:
+            self.log_tab.add_log(f"✅ Автоматически загружен файл {os.path.basename(file_path)}")
+        else:
+            self.log_tab.add_log(f"✅ Загружен файл: {os.path.basename(file_path)}")
+        
+        # Передаем данные во все вкладки
+        self.updateAllTabs()
+    
+    def onStreamingStatsReady(self, stats, file_path):
+        self.stat_tab.load().show_streaming_stats(stats, os.path.basename(file_path))
+        self.tabs.setCurrentWidget(self.stat_tab)
+        self.statusBar.showMessage(f"Потоковая статистика: {stats.rows} записей")
+        self.log_tab.add_log(f"📊 Потоковая статистика по файлу {os.path.basename(file_path)}: "
+                             f"{stats.rows} записей")
+    
+    def onLoadFailed(self, message):
+        if self.auto_load:
+            self.statusBar.showMessage(f"Ошибка загрузки: {message}")
+            self.log_tab.add_log(f"❌ Ошибка загрузки данных: {message}", logging.ERROR)
+        else:
+            self.statusBar.showMessage("Ошибка загрузки")
+            QMessageBox.critical(self, 'Ошибка', f'Не удалось загрузить файл: {message}')
+            self.log_tab.add_log(f"❌ Ошибка загрузки: {message}", logging.ERROR)
+    
+    def onLoadCancelled(self):
+        self.statusBar.showMessage("Загрузка отменена")
+        self.log_tab.add_log("⏹ Загрузка отменена пользователем", logging.WARNING)
+    
+    def onLoaderFinished(self):
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+        self.cancel_action.setEnabled(False)
     
     def updateAllTabs(self):
-        """Обновляет все вкладки с новыми данными"""
+        """Помечает вкладки устаревшими и обновляет только текущую"""
         if self.df is not None:
-            self.stat_tab.update_data(self.df)
-            self.correlation_tab.update_data(self.df)
-            self.heatmap_tab.update_data(self.df)
-            self.linear_tab.update_data(self.df)
+            self.dirty_tabs = {self.stat_tab, self.correlation_tab,
+                               self.heatmap_tab, self.linear_tab, self.pivot_tab}
+            self.refreshTab(self.tabs.currentWidget())
             self.log_tab.add_log("📊 Данные обновлены во всех вкладках")
+    
+    def startTail(self, file_path, file_size):
+        """Запоминает, с какого байта читать дописанные строки загруженного файла"""
+        from utils.tail import CsvTail
+        
+        if self.file_watcher.files():
+            self.file_watcher.removePaths(self.file_watcher.files())
+        self.tail = None
+        if not file_path.endswith('.csv') or file_size is None:
+            return
+        
+        self.tail = CsvTail(file_path, file_size, self.df.columns, self.df.dtypes.to_dict())
+        if self.watch_action.isChecked():
+            self.file_watcher.addPath(file_path)
+    
+    def toggleWatch(self, enabled):
+        if self.tail is None:
+            if enabled:
+                self.log_tab.add_log("⚠ Слежение возможно только за загруженным CSV файлом",
+                                     logging.WARNING)
+            return
+        
+        if enabled:
+            self.file_watcher.addPath(self.tail.file_path)
+            self.log_tab.add_log(f"👁 Слежение за файлом {os.path.basename(self.tail.file_path)} включено")
+            # Строки могли дописать, пока слежение было выключено
+            self.watch_timer.start(0)
+        else:
+            self.file_watcher.removePath(self.tail.file_path)
+            self.log_tab.add_log("👁 Слежение за файлом выключено")
+    
+    def onWatchedFileChanged(self, path):
+        # Некоторые редакторы подменяют файл целиком - тогда путь выпадает из наблюдения
+        if os.path.exists(path) and path not in self.file_watcher.files():
+            self.file_watcher.addPath(path)
+        self.watch_timer.start(WATCH_DELAY_MS)
+    
+    def appendNewRows(self):
+        """Дочитывает новые строки файла и добавляет их к данным без полной перезагрузки"""
+        from utils.profiling import timed
+        from utils.schema import SchemaMismatch
+        from utils.tail import FileTruncated
+        
+        if self.tail is None or not self.watch_action.isChecked():
+            return
+        if self.loader is not None and self.loader.isRunning():
+            self.watch_timer.start(WATCH_DELAY_MS)
+            return
+        
+        file_name = os.path.basename(self.tail.file_path)
+        try:
+            with timed('appendNewRows') as info:
+                rows = self.tail.read_new()
+                if rows is not None and len(rows):
+                    self.analysis.append(rows)
+                    info['rows'] = len(rows)
+        except FileTruncated:
+            self.log_tab.add_log(f"⚠ Файл {file_name} укоротился - загружаем заново", logging.WARNING)
+            self.startLoading(self.tail.file_path, auto=True)
+            return
+        except SchemaMismatch as e:
+            self.log_tab.add_log(f"⚠ Новые строки не подходят под типы данных ({e}) - загружаем заново",
+                                 logging.WARNING)
+            self.startLoading(self.tail.file_path, auto=True)
+            return
+        except Exception as e:
+            self.log_tab.add_log(f"❌ Ошибка чтения новых строк: {e}", logging.ERROR)
+            return
+        
+        if rows is None or not len(rows):
+            return
+        
+        self.df = self.analysis.df
+        self.statusBar.showMessage(f"Данные загружены: {len(self.df)} записей")
+        self.log_tab.add_log(f"➕ Из файла {file_name} добавлено {len(rows)} строк")
+        self.applyFilter()
+        self.updateAllTabs()
+    
+    def onFilterChanged(self):
+        if self.analysis is None:
+            return
+        self.applyFilter()
+        self.log_tab.add_log(f"🔎 Фильтр: {self.filter_panel.describe()} - "
+                             f"{len(self.currentAnalysis().df)} из {len(self.df)} строк")
+        self.updateAllTabs()
+    
+    def applyFilter(self):
+        """Отбирает строки по условиям панели фильтра (битовые карты, см. utils.filtering)"""
+        categories, ranges = self.filter_panel.spec()
+        self.filtered = self.analysis.subset(categories, ranges)
+        self.filter_panel.set_row_count(len(self.currentAnalysis().df), len(self.df))
+    
+    def currentAnalysis(self):
+        """Данные, которые показывают вкладки: отфильтрованные или все"""
+        return self.filtered if self.filtered is not None else self.analysis
+    
+    def onTabChanged(self, index):
+        self.refreshTab(self.tabs.widget(index))
+    
+    def refreshTab(self, tab):
+        """Передает данные вкладке, если она еще не видела текущую версию"""
+        if tab in self.dirty_tabs:
+            self.dirty_tabs.discard(tab)
+            analysis = self.currentAnalysis()
+            tab.update_data(analysis.df, analysis)
+    
+    def closeEvent(self, event):
+        # Не оставляем работающий поток при закрытии окна
+        if self.loader is not None and self.loader.isRunning():
+            self.loader.cancel()
+            self.loader.wait()
+        super().closeEvent(event)
 
 def main():
     app = QApplication(sys.argv)
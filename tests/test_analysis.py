@@ -0,0 +1,62 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.analysis import DatasetAnalysis
+
+
+def make_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    carat = rng.uniform(0.2, 3, rows)
+    df = pd.DataFrame({
+        'carat': carat,
+        'depth': rng.normal(62, 1.5, rows),
+        'price': carat * 4000 + rng.normal(0, 500, rows),
+    })
+    # Пропуски в разных строках - попарный и построчный учёт дают разные ответы
+    df.loc[rng.choice(rows, rows // 10, replace=False), 'depth'] = np.nan
+    df.loc[rng.choice(rows, rows // 20, replace=False), 'price'] = np.nan
+    return df
+
+
+def test_append_keeps_pairwise_pearson_up_to_date():
+    analysis = DatasetAnalysis(make_frame(500, 0))
+    analysis.correlation('pearson')
+    for seed in (1, 2):
+        analysis.append(make_frame(200, seed))
+
+    updated = analysis.correlation('pearson')
+    assert analysis.corr() is updated.matrix
+
+    expected = analysis.df.corr()
+    pd.testing.assert_frame_equal(updated.matrix, expected, rtol=1e-10)
+    valid = analysis.df.notna().to_numpy().astype(int)
+    np.testing.assert_array_equal(updated.counts, valid.T @ valid)
+
+
+def test_running_stats_are_seeded_on_first_append():
+    analysis = DatasetAnalysis(make_frame(500, 0))
+    analysis.describe()
+    assert analysis._running is None
+
+    analysis.append(make_frame(200, 1))
+    running = analysis._running
+    assert running.rows == 700
+    analysis.append(make_frame(100, 2))
+    stats = analysis.describe()
+    assert analysis._running is running and running.rows == 800
+    assert stats.attrs['approximate'] == ['25%', '50%', '75%']
+    exact = analysis.df.describe()
+    np.testing.assert_allclose(stats.loc[['count', 'mean', 'std', 'min', 'max'], exact.columns],
+                               exact.loc[['count', 'mean', 'std', 'min', 'max']], rtol=1e-10)
+
+
+def test_append_with_all_missing_column_does_not_warn():
+    analysis = DatasetAnalysis(make_frame(500, 0))
+    rows = make_frame(5, 1)
+    rows['depth'] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        analysis.append(rows)
+    pd.testing.assert_frame_equal(analysis.corr(), analysis.df.corr(), rtol=1e-10)
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from utils.batch import comparative_report, run_batch
+
+
+def test_same_named_files_get_separate_rows(tmp_path):
+    files = []
+    for day, price in (('day1', 300), ('day2', 900)):
+        folder = tmp_path / day
+        folder.mkdir()
+        path = folder / 'diamonds.csv'
+        pd.DataFrame({'carat': [0.2, 0.3, 0.4], 'price': [price, price + 10, price + 20]}).to_csv(
+            path, index=False)
+        files.append(str(path))
+
+    summaries, errors = run_batch(files, workers=1)
+    summary = comparative_report(summaries)['summary']
+    assert not errors
+    assert sorted(summary.index) == ['day1/diamonds.csv', 'day2/diamonds.csv']
+    assert summary.loc['day2/diamonds.csv', 'price_min'] == 900
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from utils.analysis import DatasetAnalysis
+from utils.cache import ColumnarCache
+from utils.io import load_dataframe
+
+
+def write_csv(path, rows=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': [f'D{i:05d}' for i in range(rows)],
+        'carat': rng.uniform(0.2, 3, rows).round(2),
+        'cut': rng.choice(['Fair', 'Good', 'Very Good', 'Premium', 'Ideal'], rows),
+        'price': rng.integers(300, 19000, rows),
+    })
+    df.loc[3, 'id'] = np.nan
+    df.to_csv(path, index=False)
+
+
+def test_cache_round_trip_keeps_dtypes(tmp_path):
+    csv = tmp_path / 'data.csv'
+    write_csv(csv)
+    cache = ColumnarCache(str(tmp_path / 'cache'))
+
+    first = load_dataframe(str(csv), cache=cache)
+    cached = cache.load(str(csv))
+
+    assert cached is not None
+    assert cached.dtypes.to_dict() == first.dtypes.to_dict()
+    # copy() - значения из кэша отображены в память (np.memmap)
+    pd.testing.assert_frame_equal(cached.copy(), first)
+    assert DatasetAnalysis(cached).categorical_columns == DatasetAnalysis(first).categorical_columns
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from utils.cube import AggregateCube
+from utils.schema import CUT_ORDER, COLOR_ORDER
+
+
+def make_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'cut': pd.Categorical(rng.choice(CUT_ORDER, rows), categories=CUT_ORDER, ordered=True),
+        'color': pd.Categorical(rng.choice(COLOR_ORDER, rows), categories=COLOR_ORDER, ordered=True),
+        # Большое смещение при малом разбросе - на нём sumsq - sum²/n теряет точность
+        'price': 1e8 + rng.normal(0, 0.5, rows),
+    })
+
+
+def test_std_matches_groupby_after_updates():
+    first, second = make_frame(3000, 0), make_frame(1000, 1)
+    cube = AggregateCube.from_frame(first)
+    cube.update(second)
+    df = pd.concat([first, second], ignore_index=True)
+
+    table = cube.rollup('price', 'std', rows='cut', columns='color', margins=False)
+    expected = df.groupby(['cut', 'color'], observed=False)['price'].std().unstack()
+    np.testing.assert_allclose(table.to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+    by_cut = cube.rollup('price', 'std', rows='cut', margins=True)['std']
+    expected = df.groupby('cut', observed=False)['price'].std()
+    np.testing.assert_allclose(by_cut.iloc[:-1].to_numpy(), expected.to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(by_cut.iloc[-1], df['price'].std(), rtol=1e-6)
@@ -0,0 +1,31 @@
+import threading
+
+from utils.profiling import recorder, timed
+
+
+def test_peak_survives_timed_block_in_another_thread():
+    recorder.clear()
+    recorder.set_memory_tracing(True)
+    allocated, release = threading.Event(), threading.Event()
+
+    def loader():
+        with timed('load'):
+            buffer = bytearray(20_000_000)
+            del buffer
+            allocated.set()
+            release.wait()
+
+    try:
+        thread = threading.Thread(target=loader)
+        thread.start()
+        allocated.wait()
+        # Замер в другом потоке сбрасывает пик tracemalloc - пик загрузки не должен пропасть
+        with timed('paint'):
+            pass
+        release.set()
+        thread.join()
+    finally:
+        recorder.set_memory_tracing(False)
+
+    events = {event.name: event for event in recorder.snapshot()}
+    assert events['load'].memory_delta >= 20_000_000
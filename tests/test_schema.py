@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from utils.io import complete_lines_end, load_dataframe
+from utils.schema import CUT_ORDER, SchemaMismatch, conform_categories, schema_for
+from utils.tail import CsvTail
+
+CSV = """carat,cut,color,clarity,price
+0.23,Ideal,E,SI2,326
+0.21,Premium,E,SI1,326
+0.29,Very good,I,VS2,334
+"""
+
+
+def test_known_grades_use_schema(tmp_path):
+    path = tmp_path / 'known.csv'
+    path.write_text(CSV.replace('Very good', 'Very Good'))
+    df = load_dataframe(str(path))
+    assert df['cut'].dtype == pd.CategoricalDtype(CUT_ORDER, ordered=True)
+    assert df['cut'].notna().all()
+
+
+def test_unknown_grade_is_not_turned_into_nan(tmp_path):
+    path = tmp_path / 'unknown.csv'
+    path.write_text(CSV)
+    df = load_dataframe(str(path))
+    # Схема не подошла - типы определены автоматически, значения целы
+    assert df['cut'].tolist() == ['Ideal', 'Premium', 'Very good']
+    assert 'Very good' in df.attrs['schema_warning']
+
+
+def test_conform_categories_reports_unknown_values():
+    df = pd.DataFrame({'cut': ['Ideal', 'Very good']})
+    with pytest.raises(SchemaMismatch, match='Very good'):
+        conform_categories(df, schema_for(df.columns))
+
+
+def test_tail_rejects_unknown_grade(tmp_path):
+    path = tmp_path / 'tail.csv'
+    path.write_text(CSV.replace('Very good', 'Very Good'))
+    df = load_dataframe(str(path))
+    tail = CsvTail(str(path), path.stat().st_size, df.columns, df.dtypes.to_dict())
+    with open(path, 'a') as f:
+        f.write("0.3,Excelent,E,SI1,400\n")
+    with pytest.raises(SchemaMismatch):
+        tail.read_new()
+
+
+def test_load_stops_at_size_taken_before_parsing(tmp_path):
+    path = tmp_path / 'growing.csv'
+    path.write_text(CSV.replace('Very good', 'Very Good'))
+    size = path.stat().st_size
+    with open(path, 'a') as f:
+        f.write("0.3,Good,E,SI1,400\n")
+    # Строка, дописанная во время загрузки, достаётся слежению, а не загрузке
+    df = load_dataframe(str(path), end=size)
+    assert len(df) == 3
+    tail = CsvTail(str(path), size, df.columns, df.dtypes.to_dict())
+    assert tail.read_new()['price'].tolist() == [400]
+
+
+def test_half_written_row_is_left_for_tail(tmp_path):
+    path = tmp_path / 'writing.csv'
+    path.write_text(CSV.replace('Very good', 'Very Good') + "0.3,Good,E,SI1,15")
+    end = complete_lines_end(str(path))
+    df = load_dataframe(str(path), end=end)
+    assert df['price'].tolist() == [326, 326, 334]
+
+    tail = CsvTail(str(path), end, df.columns, df.dtypes.to_dict())
+    with open(path, 'a') as f:
+        f.write("00\n")
+    assert tail.read_new()['price'].tolist() == [1500]
+
+
+def test_tail_rejects_rows_that_do_not_fit_dtypes(tmp_path):
+    path = tmp_path / 'tail.csv'
+    path.write_text(CSV.replace('Very good', 'Very Good'))
+    df = load_dataframe(str(path))
+    tail = CsvTail(str(path), path.stat().st_size, df.columns, df.dtypes.to_dict())
+    with open(path, 'a') as f:
+        f.write("0.3,Good,E,SI1,\n")
+    # Пропуск в целой колонке price - не дописываем строки с другими типами
+    with pytest.raises(SchemaMismatch):
+        tail.read_new()
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+
+from utils.association import association_matrix
+from utils.correlation import (KENDALL_SAMPLE, CorrelationResult, pearson_matrix,
+                               average_ranks, kendall_matrix, stratified_sample)
+from utils.cube import AggregateCube
+from utils.filtering import FilterIndex
+from utils.histogram import HistogramEngine
+from utils.io import CHUNK_SIZE
+from utils.regression import linear_regression
+from utils.schema import widen_stats
+from utils.sketches import HyperLogLog, SpaceSaving
+from utils.streaming import StreamingStats
+
+
+class DatasetAnalysis:
+    """Общие для всех вкладок вычисления по загруженному набору данных.
+
+    Результаты считаются при первом обращении и кэшируются до следующей
+    загрузки данных (set_data), поэтому переключение переменных и цветовых
+    схем во вкладках не пересчитывает одно и то же. Дописанные строки
+    добавляются через append(): счётчики, средние, дисперсии, корреляции,
+    частоты значений и пропуски при этом обновляются по новым строкам.
+    """
+
+    def __init__(self, df=None):
+        self.df = None
+        self.version = 0
+        self._cache = {}
+        self._running = None
+        self.set_data(df)
+
+    def set_data(self, df):
+        self.df = df
+        self.version += 1
+        self._cache = {}
+        self._running = None
+        # Для подмножества фильтра - исходный анализ и позиции строк в нём (см. subset)
+        self.parent = None
+        self.positions = None
+
+    def append(self, rows):
+        """Добавляет новые строки, обновляя накопленные статистики без полного пересчёта"""
+        if self.df is None or len(self.df) == 0:
+            self.set_data(rows)
+            return
+        if len(rows) == 0:
+            return
+
+        # Накопленные статистики строятся один раз при первом дописывании,
+        # дальше обновляются только по новым строкам
+        self._seed_running()
+        self._running.update(rows)
+
+        self.df = pd.concat([self.df, rows], ignore_index=True)
+        self.version += 1
+
+        cache = {}
+        for key, value in self._cache.items():
+            if key in ('numeric_columns', 'categorical_columns'):
+                cache[key] = value
+            elif key == 'missing':
+                cache[key] = value + rows.isna().sum()
+            elif isinstance(key, tuple) and key[0] == 'value_counts':
+                counts = value.add(rows[key[1]].value_counts(dropna=True), fill_value=0)
+                cache[key] = counts.astype('int64').sort_values(ascending=False, kind='stable')
+            elif key == 'cube':
+                value.update(rows)
+                cache[key] = value
+            elif isinstance(key, tuple) and key[0] == 'distinct_sketch':
+                for sketch in value:
+                    sketch.update(rows[key[1]])
+                cache[key] = value
+        self._cache = cache
+        # Пирсон по накопленным моментам - с тем же попарным учётом пропусков
+        # и числом пар, что и correlation() (интервалы во вкладке корреляций)
+        columns = self.numeric_columns
+        order = [self._running.cov_columns.index(col) for col in columns]
+        matrix = self._running.corr().loc[columns, columns]
+        counts = self._running.pair_counts()[np.ix_(order, order)]
+        self._cache[('correlation', 'pearson', None)] = CorrelationResult(matrix, counts, 'pearson', None)
+        self._cache['corr'] = matrix
+        # Квартили - по скетчу (приближённые, помечены в attrs), без прохода по всем строкам
+        self._cache['describe'] = self._running.describe()
+
+    def _seed_running(self, chunksize=CHUNK_SIZE):
+        """Накопленные статистики (StreamingStats) по уже загруженным строкам - основа append().
+
+        Строки обходятся порциями, чтобы временные массивы не росли с размером данных.
+        """
+        if self._running is None:
+            self._running = StreamingStats()
+            for start in range(0, len(self.df), chunksize):
+                self._running.update(self.df.iloc[start:start + chunksize])
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def numeric_columns(self):
+        return self._cached('numeric_columns', lambda: (
+            self.df.select_dtypes(include=[np.number]).columns.tolist()
+            if self.df is not None else []))
+
+    @property
+    def categorical_columns(self):
+        return self._cached('categorical_columns', lambda: (
+            [col for col in self.df.columns if isinstance(self.df[col].dtype, pd.CategoricalDtype)]
+            if self.df is not None else []))
+
+    def corr(self, method='pearson'):
+        """Корреляционная матрица по числовым колонкам (pearson, spearman или kendall)"""
+        if method == 'pearson':
+            # Матрица Пирсона отдельно кэшируется и дополняется при дописывании строк
+            return self._cached('corr', lambda: self.correlation('pearson').matrix)
+        return self.correlation(method).matrix
+
+    def correlation(self, method='pearson', sample_size=KENDALL_SAMPLE):
+        """Матрица корреляций вместе с числом наблюдений по парам (utils.correlation).
+
+        Кендалл считается по стратифицированной выборке из sample_size строк
+        (None - по всем строкам).
+        """
+        def compute():
+            columns = self.numeric_columns
+            if method == 'pearson':
+                block = self.df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+                matrix, counts = pearson_matrix(block, columns)
+                return CorrelationResult(matrix, counts, method, None)
+            if method == 'spearman':
+                block = np.column_stack([self.ranks(col) for col in columns]) if columns else \
+                    np.empty((len(self.df), 0))
+                matrix, counts = pearson_matrix(block, columns)
+                return CorrelationResult(matrix, counts, method, None)
+            if method == 'kendall':
+                rows = np.arange(len(self.df)) if sample_size is None else \
+                    stratified_sample(len(self.df), sample_size)
+                block = self.df[columns].iloc[rows].to_numpy(dtype=np.float64, na_value=np.nan)
+                matrix, counts = kendall_matrix(block, columns)
+                return CorrelationResult(matrix, counts, method,
+                                         None if len(rows) == len(self.df) else len(rows))
+            raise ValueError(f"Неизвестный метод корреляции: {method}")
+        key = ('correlation', method, sample_size if method == 'kendall' else None)
+        return self._cached(key, compute)
+
+    def association(self, method='pearson'):
+        """Смешанная матрица связей: корреляции числовых колонок методом method,
+        η для пар числовая & категориальная и V Крамера для категориальных"""
+        return self._cached(('association', method), lambda: association_matrix(
+            self.df, self.corr(method), self.categorical_columns))
+
+    def ranks(self, column):
+        """Средние ранги значений колонки - для корреляции Спирмена"""
+        return self._cached(('ranks', column), lambda: average_ranks(self.df[column]))
+
+    def top_correlations(self, n=3, method='pearson', categorical=False):
+        """Пары переменных с самой сильной (по модулю) корреляцией: [(var1, var2, r), ...].
+
+        С categorical=True пары берутся из смешанной матрицы association().
+        """
+        corr_matrix = self.association(method) if categorical else self.corr(method)
+        corr_pairs = []
+        for i in range(len(corr_matrix.columns)):
+            for j in range(i + 1, len(corr_matrix.columns)):
+                corr_pairs.append((corr_matrix.columns[i], corr_matrix.columns[j],
+                                   corr_matrix.iloc[i, j]))
+
+        # Сортируем по абсолютному значению корреляции
+        corr_pairs.sort(key=lambda pair: abs(pair[2]), reverse=True)
+        return corr_pairs[:n]
+
+    def describe(self):
+        """Описательная статистика: числовые и категориальные колонки вместе"""
+        def compute():
+            # Считаем в float64 по одной колонке: float32 - только формат хранения,
+            # а копия всего блока колонок удвоила бы память
+            numeric_stats = pd.DataFrame({col: self.df[col].astype(np.float64).describe()
+                                          for col in self.numeric_columns})
+            numeric_stats = widen_stats(numeric_stats, self.df.dtypes.to_dict())
+            other = self.df.columns.difference(self.numeric_columns, sort=False)
+            categorical_stats = self.df[other].describe() if len(other) else pd.DataFrame()
+            return pd.concat([numeric_stats, categorical_stats], axis=1)
+        return self._cached('describe', compute)
+
+    def value_counts(self, column):
+        """Частоты значений колонки по убыванию (без пропусков)"""
+        return self._cached(('value_counts', column),
+                            lambda: self.df[column].value_counts(dropna=True))
+
+    def distinct_sketch(self, column, chunksize=CHUNK_SIZE):
+        """Приближённые число различных значений и частые значения колонки.
+
+        Возвращает (HyperLogLog, SpaceSaving); колонка обходится порциями,
+        так что память не зависит от числа различных значений.
+        """
+        def compute():
+            distinct, heavy = HyperLogLog(), SpaceSaving()
+            series = self.df[column]
+            for start in range(0, len(series), chunksize):
+                part = series.iloc[start:start + chunksize]
+                distinct.update(part)
+                heavy.update(part)
+            return distinct, heavy
+        return self._cached(('distinct_sketch', column), compute)
+
+    def missing_counts(self):
+        """Число пропусков по колонкам"""
+        return self._cached('missing', lambda: self.df.isna().sum())
+
+    def histograms(self):
+        """HistogramEngine: номера интервалов и коды категорий по всем строкам"""
+        return self._cached('histograms', lambda: HistogramEngine(self.df))
+
+    def histogram(self, column, bins=30):
+        """Частоты и границы интервалов для гистограммы колонки.
+
+        bins - число интервалов или правило ('auto', 'fd', 'log'). Подмножество
+        фильтра считает частоты по номерам интервалов исходных данных, поэтому
+        границы у всех фильтров общие и не пересчитываются.
+        """
+        def compute():
+            if self.parent is not None:
+                return self.parent.histograms().counts(column, bins, self.positions)
+            return self.histograms().counts(column, bins)
+        return self._cached(('histogram', column, bins), compute)
+
+    def category_histogram(self, column):
+        """Число строк каждой категории колонки (по кодам категорий)"""
+        def compute():
+            if self.parent is not None:
+                return self.parent.histograms().category_counts(column, self.positions)
+            return self.histograms().category_counts(column)
+        return self._cached(('category_histogram', column), compute)
+
+    def regression(self, x_column, y_column):
+        """Линейная регрессия y по x (наклон, R², ошибки, p-value)"""
+        return self._cached(('regression', x_column, y_column), lambda: linear_regression(
+            self.df[x_column].to_numpy(dtype=np.float64, na_value=np.nan),
+            self.df[y_column].to_numpy(dtype=np.float64, na_value=np.nan)))
+
+    def sort_order(self, column):
+        """Индексы строк в порядке возрастания колонки (пропуски - в конце)"""
+        return self._cached(('sort_order', column), lambda: np.argsort(
+            self.df[column].to_numpy(dtype=np.float64, na_value=np.nan), kind='stable'))
+
+    def cube(self):
+        """Агрегаты числовых колонок по сочетаниям категориальных (utils.cube)"""
+        return self._cached('cube', lambda: AggregateCube.from_frame(self.df))
+
+    def filter_index(self):
+        """Битовые карты категорий и порядки сортировки для фильтрации (utils.filtering)"""
+        return self._cached('filter_index', lambda: FilterIndex(self.df, self.sort_order))
+
+    def subset(self, categories=None, ranges=None):
+        """DatasetAnalysis по строкам, прошедшим фильтр, или None, если фильтр пуст"""
+        positions = self.filter_index().select(categories, ranges)
+        if positions is None:
+            return None
+        # Подмножество выбирается один раз и дальше общее для всех вкладок
+        subset = DatasetAnalysis(self.df.iloc[positions].reset_index(drop=True))
+        subset.parent, subset.positions = self, positions
+        return subset
+
+    def density_grid(self, x_column, y_column, bins=200):
+        """Двумерная гистограмма пар (x, y) для отрисовки плотности точек.
+
+        Возвращает матрицу счётчиков формы (bins, bins) и границы
+        [xmin, xmax, ymin, ymax]. Считается одним np.bincount по номерам ячеек.
+        """
+        def compute():
+            x = self.df[x_column].to_numpy(dtype=np.float64, na_value=np.nan)
+            y = self.df[y_column].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~(np.isnan(x) | np.isnan(y))
+            x, y = x[valid], y[valid]
+            if len(x) == 0:
+                return np.zeros((bins, bins), dtype=np.int64), [0.0, 1.0, 0.0, 1.0]
+
+            extent = [x.min(), x.max(), y.min(), y.max()]
+            x_span = (extent[1] - extent[0]) or 1.0
+            y_span = (extent[3] - extent[2]) or 1.0
+            ix = np.minimum(((x - extent[0]) * (bins / x_span)).astype(np.int64), bins - 1)
+            iy = np.minimum(((y - extent[2]) * (bins / y_span)).astype(np.int64), bins - 1)
+            counts = np.bincount(ix * bins + iy, minlength=bins * bins)
+            return counts.reshape(bins, bins), extent
+        return self._cached(('density', x_column, y_column, bins), compute)
@@ -0,0 +1,93 @@
+"""Меры связи для смешанных типов колонок.
+
+Числовая & категориальная - корреляционное отношение η, категориальная &
+категориальная - V Крамера. Обе меры считаются по целочисленным кодам
+категорий: по каждой категориальной колонке для числовой колонки
+np.bincount собирает число, сумму и сумму квадратов по группам, а для пары
+категориальных - таблицу сопряжённости. Дальше всё считается по этим
+маленьким массивам, а не по строкам.
+"""
+import numpy as np
+import pandas as pd
+
+
+def category_codes(series):
+    """Коды категорий (-1 для пропусков) и число категорий"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), len(series.cat.categories)
+    codes, uniques = pd.factorize(series)
+    return codes, len(uniques)
+
+
+def group_moments(codes, n_groups, values):
+    """Число, сумма и сумма квадратов значений по группам (без пропусков)"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = (codes >= 0) & ~np.isnan(values)
+    groups = codes[valid]
+    # Центрирование по общему среднему уменьшает ошибку округления в суммах квадратов
+    centered = values[valid] - values[valid].mean() if valid.any() else values[valid]
+    count = np.bincount(groups, minlength=n_groups)
+    total = np.bincount(groups, weights=centered, minlength=n_groups)
+    squares = np.bincount(groups, weights=centered * centered, minlength=n_groups)
+    return count, total, squares
+
+
+def correlation_ratio(count, total, squares):
+    """Корреляционное отношение η = sqrt(межгрупповая / общая сумма квадратов)"""
+    n = count.sum()
+    if n < 2:
+        return np.nan
+    grand = total.sum() ** 2 / n
+    present = count > 0
+    between = (total[present] ** 2 / count[present]).sum() - grand
+    overall = squares.sum() - grand
+    if overall <= 0:
+        return np.nan
+    return float(np.sqrt(np.clip(between / overall, 0.0, 1.0)))
+
+
+def contingency_table(codes_a, n_a, codes_b, n_b):
+    """Таблица сопряжённости двух колонок кодов (строки с пропусками не учитываются)"""
+    valid = (codes_a >= 0) & (codes_b >= 0)
+    cells = codes_a[valid].astype(np.int64) * n_b + codes_b[valid]
+    return np.bincount(cells, minlength=n_a * n_b).reshape(n_a, n_b)
+
+
+def cramers_v(table):
+    """V Крамера по таблице сопряжённости"""
+    # Пустые строки и столбцы (категории без наблюдений) не влияют на хи-квадрат
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    k = min(table.shape) - 1
+    if n == 0 or k < 1:
+        return np.nan
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(np.sqrt(min(chi2 / (n * k), 1.0)))
+
+
+def association_matrix(df, numeric_corr, categorical):
+    """Смешанная матрица связей.
+
+    numeric_corr - уже посчитанная корреляционная матрица числовых колонок
+    (любым методом), categorical - категориальные колонки df. Блоки
+    числовая & категориальная заполняются η, категориальная &
+    категориальная - V Крамера; на диагонали 1.
+    """
+    numeric = list(numeric_corr.columns)
+    columns = numeric + list(categorical)
+    matrix = pd.DataFrame(np.eye(len(columns)), index=columns, columns=columns)
+    matrix.loc[numeric, numeric] = numeric_corr.to_numpy()
+
+    codes = {col: category_codes(df[col]) for col in categorical}
+    for i, col in enumerate(categorical):
+        col_codes, n_groups = codes[col]
+        for num in numeric:
+            eta = correlation_ratio(*group_moments(
+                col_codes, n_groups, df[num].to_numpy(dtype=np.float64, na_value=np.nan)))
+            matrix.loc[col, num] = matrix.loc[num, col] = eta
+        for other in categorical[i + 1:]:
+            other_codes, n_other = codes[other]
+            v = cramers_v(contingency_table(col_codes, n_groups, other_codes, n_other))
+            matrix.loc[col, other] = matrix.loc[other, col] = v
+    return matrix
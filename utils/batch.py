@@ -0,0 +1,147 @@
+"""Параллельный анализ множества файлов в пуле процессов.
+
+Каждый файл обрабатывается отдельным процессом потоково (utils.streaming),
+поэтому память на процесс ограничена размером порции, а не размером файла.
+Вместо файла можно передать папку колонок (utils.column_store): процесс
+получает только путь и читает отображённые в память колонки без разбора
+текста и без передачи данных между процессами.
+Из процессов возвращаются только небольшие агрегаты, которые затем
+сводятся в общий сравнительный отчёт.
+"""
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.column_store import ColumnStore, is_column_store
+from utils.io import CHUNK_SIZE, load_dataframe
+from utils.streaming import StreamingStats, stream_file_stats
+
+DATA_EXTENSIONS = ('.csv', '.xlsx')
+
+
+def expand_inputs(inputs):
+    """Разворачивает папки и шаблоны (*.csv) в отсортированный список файлов"""
+    files = []
+    for item in inputs:
+        if is_column_store(item):
+            candidates = [item]
+        elif os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        elif glob.has_magic(item):
+            candidates = glob.glob(item)
+        else:
+            candidates = [item]
+        files.extend(path for path in candidates
+                     if is_column_store(path) or (os.path.isfile(path) and path.endswith(DATA_EXTENSIONS)))
+    return sorted(set(files))
+
+
+def summarize_file(file_path, chunksize=CHUNK_SIZE, top=3):
+    """Агрегаты одного файла: то же, что показывают StatTab и HeatmapTab"""
+    if is_column_store(file_path):
+        # Порции - срезы отображённых в память колонок, данные не копируются целиком
+        frame = ColumnStore(file_path).to_frame()
+        stats = StreamingStats()
+        for start in range(0, len(frame), chunksize):
+            stats.update(frame.iloc[start:start + chunksize])
+    elif file_path.endswith('.csv'):
+        stats = stream_file_stats(file_path, chunksize=chunksize)
+    else:
+        # Excel порциями не читается - загружаем целиком
+        stats = StreamingStats()
+        stats.update(load_dataframe(file_path))
+
+    corr = stats.corr()
+    pairs = []
+    for i in range(len(corr.columns)):
+        for j in range(i + 1, len(corr.columns)):
+            pairs.append((corr.columns[i], corr.columns[j], corr.iloc[i, j]))
+    pairs.sort(key=lambda pair: abs(pair[2]) if not np.isnan(pair[2]) else -1, reverse=True)
+
+    return {
+        'file': file_path,
+        'rows': stats.rows,
+        'statistics': stats.describe(),
+        'missing': stats.missing_counts(),
+        'correlation': corr,
+        'top_correlations': pairs[:top],
+    }
+
+
+def run_batch(files, workers=None, chunksize=CHUNK_SIZE, top=3, on_result=None):
+    """Обрабатывает файлы в пуле из workers процессов.
+
+    Возвращает (список сводок, {файл: текст ошибки}). on_result(сводка или
+    None, файл, ошибка) вызывается по мере готовности каждого файла.
+    """
+    summaries, errors = [], {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(summarize_file, path, chunksize, top): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                errors[path] = str(e)
+                if on_result:
+                    on_result(None, path, str(e))
+                continue
+            summaries.append(summary)
+            if on_result:
+                on_result(summary, path, None)
+
+    summaries.sort(key=lambda summary: summary['file'])
+    return summaries, errors
+
+
+def file_labels(paths):
+    """Различимые имена файлов для отчёта: путь относительно общей папки.
+
+    Одноимённые файлы из разных папок (day1/data.csv, day2/data.csv)
+    получают разные имена, а не перезаписывают друг друга.
+    """
+    full = {path: os.path.abspath(path) for path in paths}
+    if not full:
+        return {}
+    root = os.path.commonpath(list(full.values()))
+    if root in full.values():
+        root = os.path.dirname(root)
+    return {path: os.path.relpath(absolute, root) for path, absolute in full.items()}
+
+
+def comparative_report(summaries):
+    """Сводные таблицы по всем файлам.
+
+    Возвращает {'summary': одна строка на файл, 'correlations': пары
+    переменных по файлам в длинном формате}.
+    """
+    rows = []
+    correlations = []
+    labels = file_labels([summary['file'] for summary in summaries])
+    for summary in summaries:
+        row = {'file': labels[summary['file']],
+               'rows': summary['rows'],
+               'missing': int(summary['missing'].sum())}
+        stats = summary['statistics']
+        for col in stats.columns:
+            for stat in ('mean', 'std', 'min', '50%', 'max', 'top', 'freq'):
+                if stat in stats.index and not pd.isna(stats.at[stat, col]):
+                    row[f'{col}_{stat}'] = stats.at[stat, col]
+        for rank, (var1, var2, value) in enumerate(summary['top_correlations'], start=1):
+            row[f'top{rank}_pair'] = f'{var1} & {var2}'
+            row[f'top{rank}_r'] = value
+        rows.append(row)
+
+        corr = summary['correlation']
+        for i in range(len(corr.columns)):
+            for j in range(i + 1, len(corr.columns)):
+                correlations.append({'file': row['file'], 'var1': corr.columns[i],
+                                     'var2': corr.columns[j], 'r': corr.iloc[i, j]})
+
+    return {
+        'summary': pd.DataFrame(rows).set_index('file') if rows else pd.DataFrame(),
+        'correlations': pd.DataFrame(correlations, columns=['file', 'var1', 'var2', 'r']),
+    }
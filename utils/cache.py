@@ -0,0 +1,147 @@
+import hashlib
+import importlib.util
+import os
+import shutil
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.diamond_analyzer_cache')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+# Форматы записей: папка колонок .npy (utils.column_store) или файл Feather
+STORAGE_EXTENSIONS = {'columns': '.columns', 'feather': '.feather'}
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class ColumnarCache:
+    """Кэш загруженных CSV в колоночном формате.
+
+    По умолчанию запись - папка колонок .npy, которые при чтении отображаются
+    в память без копирования (utils.column_store); storage='feather'
+    сохраняет в Feather (нужен pyarrow). Имя записи состоит из хэша пути к
+    исходному файлу и хэша его mtime и размера, поэтому изменённый файл
+    автоматически получает новую запись. Общий размер кэша ограничен
+    max_bytes: при переполнении удаляются записи, к которым дольше всего
+    не обращались.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, storage='columns'):
+        if storage not in STORAGE_EXTENSIONS:
+            raise ValueError(f"Неизвестный формат кэша: {storage}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.storage = storage
+
+    @property
+    def available(self):
+        if self.storage == 'columns':
+            return True
+        # pyarrow необязателен: без него кэш Feather просто отключается. Проверяем
+        # наличие без импорта, сам pyarrow загружается при первом обращении
+        return importlib.util.find_spec('pyarrow') is not None
+
+    def entry_path(self, file_path):
+        stat = os.stat(file_path)
+        source_key = _digest(os.path.abspath(file_path))
+        version_key = _digest(f"{stat.st_mtime_ns}:{stat.st_size}")
+        extension = STORAGE_EXTENSIONS[self.storage]
+        return os.path.join(self.cache_dir, f"{source_key}-{version_key}{extension}")
+
+    def contains(self, file_path):
+        return self.available and os.path.exists(self.entry_path(file_path))
+
+    def load(self, file_path):
+        """Возвращает DataFrame из кэша или None, если актуальной записи нет"""
+        if not self.available:
+            return None
+        entry = self.entry_path(file_path)
+        if not os.path.exists(entry):
+            return None
+        try:
+            if self.storage == 'columns':
+                # numpy/pandas подгружаются при первом обращении к кэшу, а не при запуске
+                from utils.column_store import ColumnStore
+                df = ColumnStore(entry).to_frame()
+            else:
+                import pyarrow.feather as feather
+                table = feather.read_table(entry, memory_map=True)
+                df = table.to_pandas()
+        except Exception:
+            # Повреждённая запись - удаляем и читаем исходный файл
+            self._remove(entry)
+            return None
+        os.utime(entry)  # отмечаем обращение для вытеснения по давности
+        return df
+
+    def store(self, file_path, df):
+        """Сохраняет DataFrame в кэш; ошибки записи не мешают работе"""
+        if not self.available:
+            return False
+        entry = self.entry_path(file_path)
+        tmp_path = entry + '.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.invalidate(file_path)
+            if self.storage == 'columns':
+                from utils.column_store import write_column_store
+                write_column_store(df, entry)
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(df, tmp_path)
+                os.replace(tmp_path, entry)
+        except Exception:
+            self._remove(tmp_path)
+            return False
+        self.evict()
+        return True
+
+    def invalidate(self, file_path):
+        """Удаляет все записи для указанного исходного файла"""
+        prefix = _digest(os.path.abspath(file_path)) + '-'
+        for name, _, _ in self._entries():
+            if name.startswith(prefix):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def clear(self):
+        for name, _, _ in self._entries():
+            self._remove(os.path.join(self.cache_dir, name))
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Удаляет самые давно использованные записи, пока кэш больше лимита"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(tuple(STORAGE_EXTENSIONS.values())):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            if os.path.isdir(path):
+                size = sum(item.stat().st_size for item in os.scandir(path))
+            else:
+                size = stat.st_size
+            entries.append((name, size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _remove(path):
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,108 @@
+"""Хранение набора данных в виде папки с колонками .npy.
+
+Каждая колонка - отдельный файл .npy; категориальные и строковые колонки
+хранятся кодами (int8, если категорий не больше 127) плюс словарь категорий
+в meta.json. Строковые колонки при чтении собираются обратно в исходный тип.
+Колонки открываются через np.load(mmap_mode='r'), поэтому DataFrame из
+open_column_store() не копирует данные: вкладки, фоновые потоки и процессы
+пакетного режима читают одни и те же страницы файла через кэш ОС, а в
+процессы передаётся только путь к папке.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+META_FILE = 'meta.json'
+STORE_VERSION = 2  # 2: строковые колонки восстанавливаются в исходном типе
+
+
+def is_column_store(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def _codes_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def write_column_store(df, directory):
+    """Сохраняет DataFrame в папку directory (атомарно: через временную папку)"""
+    tmp_dir = directory + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        file_name = f'{i:03d}.npy'
+        entry = {'name': str(col), 'file': file_name}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            values = series.cat.codes.to_numpy().astype(_codes_dtype(len(categories)))
+            entry.update(kind='categorical', categories=categories.tolist(),
+                         ordered=bool(series.cat.ordered))
+        elif pd.api.types.is_numeric_dtype(series.dtype) and isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+            entry['kind'] = 'numeric'
+        else:
+            # Строки и прочие объекты хранятся кодами со словарём, но при чтении
+            # возвращаются в исходном типе - иначе колонка вроде id после кэша
+            # стала бы категориальной (и измерением куба, сводной таблицы и т.д.)
+            codes, categories = pd.factorize(series)
+            values = codes.astype(_codes_dtype(len(categories)))
+            entry.update(kind='string', categories=categories.tolist(), dtype=str(series.dtype))
+        np.save(os.path.join(tmp_dir, file_name), np.ascontiguousarray(values))
+        columns.append(entry)
+
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': STORE_VERSION, 'rows': len(df), 'columns': columns}, f,
+                  ensure_ascii=False)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+
+class ColumnStore:
+    """Открытая папка колонок: массивы отображаются в память по требованию"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != STORE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия хранилища колонок: {self.meta.get('version')}")
+        self.rows = self.meta['rows']
+        self.columns = [entry['name'] for entry in self.meta['columns']]
+        self._entries = {entry['name']: entry for entry in self.meta['columns']}
+
+    def array(self, column):
+        """Массив колонки (для категориальных - коды) без чтения файла целиком"""
+        entry = self._entries[column]
+        return np.load(os.path.join(self.directory, entry['file']), mmap_mode='r')
+
+    def categories(self, column):
+        return self._entries[column].get('categories')
+
+    def series(self, column):
+        entry = self._entries[column]
+        values = self.array(column)
+        if entry['kind'] == 'categorical':
+            dtype = pd.CategoricalDtype(entry['categories'], ordered=entry['ordered'])
+            values = pd.Categorical.from_codes(values, dtype=dtype)
+        elif entry['kind'] == 'string':
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+            return pd.Series(values, name=column).astype(entry['dtype'])
+        return pd.Series(values, name=column, copy=False)
+
+    def to_frame(self):
+        """DataFrame поверх отображённых в память колонок (только для чтения)"""
+        return pd.DataFrame({col: self.series(col) for col in self.columns}, copy=False)
+
+
+def open_column_store(directory):
+    return ColumnStore(directory).to_frame()
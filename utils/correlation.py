@@ -0,0 +1,158 @@
+"""Корреляционные матрицы Пирсона, Спирмена и Кендалла для больших данных.
+
+Пирсон считается матричными произведениями (BLAS) над блоком центрированных
+колонок: пропуски обнуляются, а попарные суммы и число наблюдений
+получаются произведениями с маской - так же попарно, как DataFrame.corr(),
+но без цикла по парам. Спирмен - это Пирсон по рангам колонок (ранги
+кэшируются в DatasetAnalysis). Кендалл считается по парам на
+стратифицированной выборке строк. Для каждого коэффициента есть
+доверительный интервал через z-преобразование Фишера.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+METHOD_NAMES = {'pearson': 'Пирсон', 'spearman': 'Спирмен', 'kendall': 'Кендалл'}
+KENDALL_SAMPLE = 20000
+KENDALL_STRATA = 100
+RANK_PROBE = 100000  # по стольким первым значениям оценивается число различных
+
+# Дисперсия z-преобразования для n наблюдений: c / (n - d) (Fieller и др.)
+_Z_VARIANCE = {'pearson': (1.0, 3), 'spearman': (1.06, 3), 'kendall': (0.437, 4)}
+
+CorrelationResult = namedtuple('CorrelationResult', ['matrix', 'counts', 'method', 'sample_size'])
+
+
+def pearson_matrix(block, columns, dtype=np.float64):
+    """Попарная матрица Пирсона для блока (строки x колонки) с пропусками NaN.
+
+    Возвращает (DataFrame корреляций, массив числа пар без пропусков).
+    """
+    block = np.asarray(block, dtype=dtype)
+    valid = ~np.isnan(block)
+    if valid.all():
+        # Без пропусков достаточно одного произведения центрированного блока
+        centered = block - block.mean(axis=0)
+        products = centered.T @ centered
+        scale = np.sqrt(np.diag(products))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.clip(products / np.outer(scale, scale), -1.0, 1.0)
+        counts = np.full(products.shape, len(block), dtype=np.int64)
+        if len(block) < 2:
+            corr[:] = np.nan
+        return pd.DataFrame(corr.astype(np.float64), index=columns, columns=columns), counts
+
+    # Центрирование по среднему колонки уменьшает ошибку округления в суммах
+    centered = np.where(valid, block - np.nanmean(block, axis=0), 0).astype(dtype)
+    mask = valid.astype(dtype)
+
+    counts = mask.T @ mask
+    sums = centered.T @ mask              # [i, j] = сумма x_i по строкам, где есть x_j
+    squares = (centered * centered).T @ mask
+    products = centered.T @ centered
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = products - sums * sums.T / counts
+        variance_x = squares - sums * sums / counts
+        corr = covariance / np.sqrt(variance_x * variance_x.T)
+    corr = np.clip(corr.astype(np.float64), -1.0, 1.0)
+    corr[counts < 2] = np.nan
+    return pd.DataFrame(corr, index=columns, columns=columns), counts.astype(np.int64)
+
+
+def average_ranks(values):
+    """Средние ранги значений (пропуски остаются NaN).
+
+    У одинаковых значений ранг - середина их отрезка в отсортированном
+    порядке. Если различных значений немного (price, carat), значения
+    сводятся к уникальным хэшем и сортируются только уникальные; для почти
+    непрерывных колонок дешевле одна полная сортировка.
+    """
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    probe = values[:RANK_PROBE]
+    if len(pd.unique(probe)) < len(probe) / 2:
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(uniques)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))[order]
+        ends = np.cumsum(counts)
+        ranks_by_code = np.empty(len(uniques))
+        ranks_by_code[order] = (2 * ends - counts + 1) / 2.0
+        return np.where(codes >= 0, ranks_by_code[np.maximum(codes, 0)], np.nan)
+
+    valid = ~np.isnan(values)
+    present = values[valid]
+    order = np.argsort(present)
+    ordered = present[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(ordered)]
+    ranks = np.empty(len(ordered))
+    ranks[order] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    result = np.full(len(values), np.nan)
+    result[valid] = ranks
+    return result
+
+
+def stratified_sample(n_rows, size, strata=None, seed=0):
+    """Номера строк выборки, пропорциональной слоям.
+
+    strata - код слоя для каждой строки (например, коды cut); по умолчанию
+    слои - KENDALL_STRATA равных блоков подряд идущих строк, чтобы выборка
+    покрывала весь файл, а не его начало.
+    """
+    if n_rows <= size:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(seed)
+    if strata is None:
+        strata = np.arange(n_rows) * KENDALL_STRATA // n_rows
+    strata = np.asarray(strata)
+
+    order = np.argsort(strata, kind='stable')
+    _, starts, counts = np.unique(strata[order], return_index=True, return_counts=True)
+    quotas = np.maximum(1, np.round(counts * size / n_rows).astype(np.int64))
+    sample = [order[start + rng.choice(count, min(quota, count), replace=False)]
+              for start, count, quota in zip(starts, counts, quotas)]
+    return np.sort(np.concatenate(sample))
+
+
+def kendall_matrix(block, columns):
+    """Попарная матрица тау-b Кендалла (scipy, O(n log n) на пару)"""
+    from scipy.stats import kendalltau
+
+    k = len(columns)
+    corr = np.eye(k)
+    counts = np.zeros((k, k), dtype=np.int64)
+    valid = ~np.isnan(block)
+    for i in range(k):
+        counts[i, i] = valid[:, i].sum()
+        for j in range(i + 1, k):
+            pair = valid[:, i] & valid[:, j]
+            counts[i, j] = counts[j, i] = pair.sum()
+            if counts[i, j] < 2:
+                corr[i, j] = corr[j, i] = np.nan
+                continue
+            corr[i, j] = corr[j, i] = kendalltau(block[pair, i], block[pair, j]).statistic
+    return pd.DataFrame(corr, index=columns, columns=columns), counts
+
+
+def confidence_interval(r, n, method='pearson', level=0.95):
+    """Доверительный интервал коэффициента через z-преобразование Фишера"""
+    from scipy.stats import norm
+
+    c, d = _Z_VARIANCE[method]
+    r = np.asarray(r, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+        half_width = norm.ppf(0.5 + level / 2) * np.sqrt(c / (n - d))
+        low, high = np.tanh(z - half_width), np.tanh(z + half_width)
+    too_small = n <= d
+    return np.where(too_small, np.nan, low), np.where(too_small, np.nan, high)
+
+
+def interval(result, var1, var2, level=0.95):
+    """Интервал для пары переменных из CorrelationResult"""
+    i = result.matrix.columns.get_loc(var1)
+    j = result.matrix.columns.get_loc(var2)
+    low, high = confidence_interval(result.matrix.iat[i, j], result.counts[i, j], result.method, level)
+    return float(low), float(high)
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+# Статистики, которые выводятся из агрегатов ячейки
+CUBE_STATS = ['count', 'sum', 'mean', 'std', 'min', 'max']
+
+
+class AggregateCube:
+    """Агрегаты числовых колонок по всем сочетаниям категориальных колонок.
+
+    Для каждой ячейки (например, cut × color × clarity) и каждой числовой
+    колонки хранятся count, sum, M2 (сумма квадратов отклонений от среднего
+    ячейки), min и max. Они объединяются (M2 - по формуле Чана, как в
+    utils.streaming), поэтому любая группировка по части измерений и срез по
+    значениям - это свёртка маленького массива, а не groupby по всем строкам.
+    Новые строки добавляются через update().
+    """
+
+    def __init__(self, dimensions, measures):
+        # dimensions - {колонка: список категорий}, measures - числовые колонки
+        self.dimensions = list(dimensions)
+        self.categories = {dim: list(categories) for dim, categories in dimensions.items()}
+        self.measures = list(measures)
+        self.shape = tuple(len(self.categories[dim]) for dim in self.dimensions)
+        size = int(np.prod(self.shape))
+        self.count = {m: np.zeros(size) for m in self.measures}
+        self.sum = {m: np.zeros(size) for m in self.measures}
+        self.m2 = {m: np.zeros(size) for m in self.measures}
+        self.min = {m: np.full(size, np.inf) for m in self.measures}
+        self.max = {m: np.full(size, -np.inf) for m in self.measures}
+        self.rows = 0
+
+    @classmethod
+    def from_frame(cls, df):
+        """Куб по всем категориальным и числовым колонкам DataFrame"""
+        dimensions = {col: df[col].cat.categories for col in df.columns
+                      if isinstance(df[col].dtype, pd.CategoricalDtype)}
+        measures = df.select_dtypes(include=[np.number]).columns
+        cube = cls(dimensions, measures)
+        cube.update(df)
+        return cube
+
+    def update(self, df):
+        """Добавляет строки в агрегаты: по одному np.bincount на статистику"""
+        self.rows += len(df)
+        if not self.dimensions:
+            return
+        codes = []
+        for dim in self.dimensions:
+            categories = pd.CategoricalDtype(self.categories[dim])
+            codes.append(df[dim].astype(categories).cat.codes.to_numpy())
+        codes = np.stack(codes)
+        # Строки с пропуском в любом измерении в куб не попадают
+        complete = (codes >= 0).all(axis=0)
+        cells = np.ravel_multi_index(codes[:, complete], self.shape)
+        size = len(self.count[self.measures[0]]) if self.measures else 0
+
+        for m in self.measures:
+            values = df[m].to_numpy(dtype=np.float64, na_value=np.nan)[complete]
+            valid = ~np.isnan(values)
+            cell, values = cells[valid], values[valid]
+            count_b = np.bincount(cell, minlength=size)
+            sum_b = np.bincount(cell, weights=values, minlength=size)
+            mean_b = _mean(sum_b, count_b)
+            m2_b = np.bincount(cell, weights=(values - mean_b[cell]) ** 2, minlength=size)
+
+            # Объединение с накопленным по Чану: разность сумм квадратов не используется
+            count_a = self.count[m]
+            count = count_a + count_b
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weight = np.where(count > 0, count_a * count_b / count, 0)
+            self.m2[m] += m2_b + (mean_b - _mean(self.sum[m], count_a)) ** 2 * weight
+            self.count[m] = count
+            self.sum[m] += sum_b
+            np.minimum.at(self.min[m], cell, values)
+            np.maximum.at(self.max[m], cell, values)
+
+    def rollup(self, measure, stat='mean', rows=None, columns=None, selection=None, margins=True):
+        """Сводная таблица по кубу.
+
+        rows / columns - измерения для строк и столбцов (columns может быть
+        None), selection - {измерение: [значения]} для среза (drill-down).
+        Остальные измерения сворачиваются. С margins добавляются итоги "Все".
+        """
+        selection = selection or {}
+        keep = [dim for dim in (rows, columns) if dim is not None]
+        arrays = {}
+        for name, source in (('count', self.count), ('sum', self.sum), ('m2', self.m2),
+                             ('min', self.min), ('max', self.max)):
+            array = source[measure].reshape(self.shape)
+            # Срез по выбранным значениям измерений
+            for axis, dim in enumerate(self.dimensions):
+                if dim in selection:
+                    index = [self.categories[dim].index(value) for value in selection[dim]]
+                    array = np.take(array, index, axis=axis)
+            arrays[name] = array
+
+        labels = {dim: [value for value in self.categories[dim]
+                        if dim not in selection or value in selection[dim]]
+                  for dim in keep}
+        table = self._reduce(arrays, keep, stat)
+        if margins and keep:
+            # Итоги - та же свёртка, но без одного из измерений
+            table = self._with_margins(arrays, keep, stat, table)
+            for dim in keep:
+                labels[dim] = labels[dim] + ['Все']
+
+        if columns is None:
+            return pd.DataFrame({stat: np.atleast_1d(table)},
+                                index=pd.Index(labels[rows], name=rows) if rows else ['Все'])
+        return pd.DataFrame(table, index=pd.Index(labels[rows], name=rows),
+                            columns=pd.Index(labels[columns], name=columns))
+
+    def _reduce(self, arrays, keep, stat):
+        axes = tuple(axis for axis, dim in enumerate(self.dimensions) if dim not in keep)
+        count = arrays['count'].sum(axis=axes, keepdims=True)
+        total = arrays['sum'].sum(axis=axes, keepdims=True)
+        # M2 группы - M2 ячеек плюс разброс средних ячеек вокруг среднего группы
+        spread = arrays['count'] * (_mean(arrays['sum'], arrays['count']) - _mean(total, count)) ** 2
+        reduced = {
+            'count': count.squeeze(axis=axes),
+            'sum': total.squeeze(axis=axes),
+            'm2': (arrays['m2'] + spread).sum(axis=axes),
+            'min': arrays['min'].min(axis=axes, initial=np.inf),
+            'max': arrays['max'].max(axis=axes, initial=-np.inf),
+        }
+
+        # Порядок осей после свёртки - как в self.dimensions; приводим к (rows, columns)
+        remaining = [dim for dim in self.dimensions if dim in keep]
+        if remaining != keep:
+            reduced = {name: array.T for name, array in reduced.items()}
+        return self._stat(reduced, stat)
+
+    def _with_margins(self, arrays, keep, stat, table):
+        if len(keep) == 1:
+            total = self._reduce(arrays, [], stat)
+            return np.append(table, total)
+        rows, columns = keep
+        row_totals = self._reduce(arrays, [rows], stat)
+        column_totals = self._reduce(arrays, [columns], stat)
+        total = self._reduce(arrays, [], stat)
+        table = np.column_stack([table, row_totals])
+        return np.vstack([table, np.append(column_totals, total)])
+
+    @staticmethod
+    def _stat(reduced, stat):
+        count = reduced['count']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if stat == 'count':
+                return count
+            if stat == 'sum':
+                return reduced['sum']
+            if stat == 'mean':
+                return np.where(count > 0, reduced['sum'] / count, np.nan)
+            if stat == 'std':
+                return np.where(count > 1, np.sqrt(reduced['m2'] / (count - 1)), np.nan)
+            if stat == 'min':
+                return np.where(count > 0, reduced['min'], np.nan)
+            if stat == 'max':
+                return np.where(count > 0, reduced['max'], np.nan)
+        raise ValueError(f"Неизвестная статистика: {stat}")
+
+
+def _mean(total, count):
+    """Среднее по суммам и числу значений; для пустых ячеек - 0 (их вес нулевой)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, 0)
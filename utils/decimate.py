@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def minmax_decimate(x, y, x_min, x_max, n_buckets):
+    """Прореживание линии по x, отсортированному по возрастанию.
+
+    Видимый диапазон [x_min, x_max] делится на n_buckets интервалов (обычно
+    по одному на пиксель ширины), и в каждом интервале остаются только точки
+    с минимальным и максимальным y. Визуально линия не меняется, а число
+    вершин не превышает 2 * n_buckets.
+    """
+    start = max(np.searchsorted(x, x_min, side='left') - 1, 0)
+    stop = min(np.searchsorted(x, x_max, side='right') + 1, len(x))
+    x, y = x[start:stop], y[start:stop]
+    n = len(x)
+    if n <= 2 * n_buckets:
+        return x, y
+
+    inner_edges = np.linspace(x[0], x[-1], n_buckets + 1)[1:-1]
+    starts = np.unique(np.concatenate([[0], np.searchsorted(x, inner_edges)]))
+    starts = starts[starts < n]
+    lengths = np.diff(np.append(starts, n))
+    positions = np.arange(n)
+
+    low = np.where(np.isnan(y), np.inf, y)
+    mins = np.repeat(np.minimum.reduceat(low, starts), lengths)
+    min_pos = np.minimum.reduceat(np.where(low == mins, positions, n), starts)
+
+    high = np.where(np.isnan(y), -np.inf, y)
+    maxs = np.repeat(np.maximum.reduceat(high, starts), lengths)
+    max_pos = np.minimum.reduceat(np.where(high == maxs, positions, n), starts)
+
+    keep = np.unique(np.concatenate([min_pos, max_pos]))
+    return x[keep], y[keep]
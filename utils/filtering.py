@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """Индексы для быстрой фильтрации строк.
+
+    Для категориальных колонок на каждое значение хранится битовая карта строк
+    (np.packbits - бит на строку), для числовых - порядок сортировки, по
+    которому диапазон находится двоичным поиском. Условия по разным колонкам
+    объединяются побитовым AND над упакованными картами, значения одной
+    колонки - побитовым OR; по всему DataFrame булевы маски не строятся.
+    """
+
+    def __init__(self, df, sort_order=None):
+        self.df = df
+        self.rows = len(df)
+        self.sort_order = sort_order or self._sort_order
+        self._bitmaps = {}
+        self._sorted = {}
+
+    def _sort_order(self, column):
+        return np.argsort(self.df[column].to_numpy(dtype=np.float64, na_value=np.nan), kind='stable')
+
+    def category_bitmaps(self, column):
+        """Словарь значение -> упакованная битовая карта строк с этим значением"""
+        if column not in self._bitmaps:
+            series = self.df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, categories = pd.factorize(series)
+            self._bitmaps[column] = {category: np.packbits(codes == code)
+                                     for code, category in enumerate(categories)}
+        return self._bitmaps[column]
+
+    def range_bitmap(self, column, low=None, high=None):
+        """Упакованная битовая карта строк с low <= значение <= high"""
+        if column not in self._sorted:
+            order = self.sort_order(column)
+            values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+            self._sorted[column] = (order, values)
+        order, values = self._sorted[column]
+
+        # Границы приводим к типу колонки: 0.3 во float32 больше, чем 0.3 во float64
+        dtype = self.df[column].dtype
+        if pd.api.types.is_float_dtype(dtype):
+            low = None if low is None else float(np.asarray(low).astype(dtype))
+            high = None if high is None else float(np.asarray(high).astype(dtype))
+
+        # Пропуски при сортировке уходят в конец и в диапазон не попадают
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, np.inf if high is None else high, side='right')
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def select(self, categories=None, ranges=None):
+        """Номера строк, прошедших фильтр, или None, если условий нет.
+
+        categories - {колонка: [значения]}, ranges - {колонка: (от, до)}.
+        """
+        bits = None
+        for column, values in (categories or {}).items():
+            bitmaps = self.category_bitmaps(column)
+            column_bits = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+            for value in values:
+                if value in bitmaps:
+                    column_bits |= bitmaps[value]
+            bits = column_bits if bits is None else bits & column_bits
+
+        for column, (low, high) in (ranges or {}).items():
+            range_bits = self.range_bitmap(column, low, high)
+            bits = range_bits if bits is None else bits & range_bits
+
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.rows))
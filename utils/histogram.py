@@ -0,0 +1,93 @@
+"""Гистограммы по закэшированным номерам интервалов.
+
+Для пары (колонка, правило интервалов) один раз считаются границы и номер
+интервала каждой строки; дальше частоты - это np.bincount по номерам, в том
+числе для подмножества строк фильтра (номера просто индексируются
+позициями строк). Категориальные колонки считаются так же, по кодам
+категорий.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.association import category_codes
+
+# Правила выбора интервалов помимо фиксированного числа
+BIN_RULES = {'auto': "Авто", 'fd': "Фридман-Диаконис", 'log': "Логарифмическая"}
+MAX_BINS = 1000
+LOG_BINS = 50
+
+
+def bin_edges(values, bins=30):
+    """Границы интервалов: число, 'auto' / 'fd' (правила numpy) или 'log'"""
+    if np.isnan(values).all():
+        return np.array([0.0, 1.0])
+    low, high = np.nanmin(values), np.nanmax(values)
+    if bins == 'log':
+        if low <= 0:
+            raise ValueError("Логарифмические интервалы возможны только для положительных значений")
+        return np.geomspace(low, high if high > low else low * 10, LOG_BINS + 1)
+    if isinstance(bins, str):
+        edges = np.histogram_bin_edges(values[~np.isnan(values)], bins=bins)
+        # На миллионах строк правила дают тысячи узких интервалов - ограничиваем
+        if len(edges) - 1 <= MAX_BINS:
+            return edges
+        bins = MAX_BINS
+    return np.histogram_bin_edges(values, bins=bins, range=(low, high))
+
+
+def bin_index(values, edges, log=False):
+    """Номер интервала каждого значения (-1 для пропусков и значений вне границ).
+
+    Интервалы равной ширины (log - в логарифмическом масштабе), поэтому номер
+    считается делением, а не поиском по границам; округление поправляется
+    сравнением с соседними границами, как в np.histogram.
+    """
+    n_bins = len(edges) - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scaled, scaled_edges = (np.log(values), np.log(edges)) if log else (values, edges)
+        position = (scaled - scaled_edges[0]) * (n_bins / (scaled_edges[-1] - scaled_edges[0]))
+        outside = ~((values >= edges[0]) & (values <= edges[-1]))  # заодно и NaN
+        index = np.clip(np.nan_to_num(position), 0, n_bins - 1).astype(np.intp)
+    index[values < edges[index]] -= 1
+    index[(values >= edges[index + 1]) & (index != n_bins - 1)] += 1
+    index[outside] = -1
+    return index.astype(np.int16 if n_bins < np.iinfo(np.int16).max else np.int32)
+
+
+class HistogramEngine:
+    """Частоты колонок одного DataFrame по номерам интервалов и кодам категорий"""
+
+    def __init__(self, df):
+        self.df = df
+        self._bins = {}   # (колонка, правило) -> (границы, номера интервалов)
+        self._codes = {}  # колонка -> (коды, категории)
+
+    def binned(self, column, bins=30):
+        key = (column, bins)
+        if key not in self._bins:
+            values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            edges = bin_edges(values, bins)
+            self._bins[key] = (edges, bin_index(values, edges, log=bins == 'log'))
+        return self._bins[key]
+
+    def counts(self, column, bins=30, positions=None):
+        """(частоты, границы) как у np.histogram; positions - строки фильтра"""
+        edges, index = self.binned(column, bins)
+        if positions is not None:
+            index = index[positions]
+        counts = np.bincount(index[index >= 0], minlength=len(edges) - 1)
+        return counts, edges
+
+    def category_counts(self, column, positions=None):
+        """Число строк каждой категории (в порядке категорий), без пропусков"""
+        if column not in self._codes:
+            series = self.df[column]
+            codes, _ = category_codes(series)
+            categories = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) \
+                else pd.unique(series.dropna())
+            self._codes[column] = (codes, categories)
+        codes, categories = self._codes[column]
+        if positions is not None:
+            codes = codes[positions]
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        return pd.Series(counts, index=pd.Index(categories, name=column), name='count')
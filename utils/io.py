@@ -0,0 +1,141 @@
+import io
+import os
+
+import pandas as pd
+
+from utils.column_store import ColumnStore, is_column_store
+from utils.profiling import timed
+from utils.schema import schema_for, apply_schema, read_dtypes, conform_categories
+
+# Размер порции при чтении CSV (строк)
+CHUNK_SIZE = 200_000
+
+
+class LoadCancelled(Exception):
+    """Загрузка прервана пользователем"""
+
+
+def load_dataframe(file_path, progress=None, is_cancelled=None, chunksize=CHUNK_SIZE, cache=None,
+                   end=None):
+    """Читает CSV или Excel файл в DataFrame.
+
+    CSV читается порциями, поэтому между порциями можно сообщать о прогрессе
+    (progress(процент)) и проверять запрос на отмену (is_cancelled()).
+    Известные колонки diamonds сразу читаются в типах из utils.schema.
+    Если передан cache (utils.cache.ColumnarCache), CSV берётся из кэша,
+    а после разбора текста сохраняется в него. Папка колонок
+    (utils.column_store) открывается отображением в память без копирования.
+    end - сколько первых байт CSV разбирать: строки, дописанные во время
+    загрузки, остаются для слежения (utils.tail) с этого смещения.
+    """
+    with timed('load_dataframe') as info:
+        df = _load_dataframe(file_path, progress, is_cancelled, chunksize, cache, end)
+        info['rows'] = len(df)
+    return df
+
+
+def _load_dataframe(file_path, progress, is_cancelled, chunksize, cache, end):
+    if is_column_store(file_path):
+        df = ColumnStore(file_path).to_frame()
+        if progress:
+            progress(100)
+        return df
+
+    if file_path.endswith('.xlsx'):
+        df = apply_schema(pd.read_excel(file_path))
+        if progress:
+            progress(100)
+        return df
+
+    if not file_path.endswith('.csv'):
+        raise ValueError(f"Неподдерживаемый формат файла: {os.path.basename(file_path)}")
+
+    # Ключ кэша - текущие размер и mtime: если файл уже дописан дальше end,
+    # ни готовая запись, ни сохранение прочитанной части ему не соответствуют
+    if end is not None and os.path.getsize(file_path) != end:
+        cache = None
+
+    if cache is not None:
+        df = cache.load(file_path)
+        if df is not None:
+            if progress:
+                progress(100)
+            return df
+
+    with open(file_path, 'rb') as handle:
+        columns = pd.read_csv(handle, nrows=0).columns
+    dtypes = schema_for(columns)
+
+    try:
+        df = _read_csv_chunks(file_path, dtypes, progress, is_cancelled, chunksize, end)
+    except (ValueError, TypeError) as e:
+        if not dtypes:
+            raise
+        # Значения не укладываются в схему - читаем с автоопределением типов,
+        # а причину сохраняем, чтобы интерфейс мог о ней сообщить
+        df = _read_csv_chunks(file_path, None, progress, is_cancelled, chunksize, end)
+        df.attrs['schema_warning'] = str(e)
+
+    if cache is not None and (end is None or os.path.getsize(file_path) == end):
+        cache.store(file_path, df)
+
+    if progress:
+        progress(100)
+    return df
+
+
+def complete_lines_end(file_path, size=None, block=64 * 1024):
+    """Смещение сразу после последнего перевода строки не дальше size байт.
+
+    Строка, которую ещё дописывают, не должна разбираться обрезанной: она
+    достанется слежению за файлом (utils.tail) целиком. Если перевода строки
+    нет вовсе, возвращается size.
+    """
+    if size is None:
+        size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as handle:
+        position = size
+        while position > 0:
+            start = max(0, position - block)
+            handle.seek(start)
+            data = handle.read(position - start)
+            newline = data.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return size
+
+
+class _FilePrefix(io.RawIOBase):
+    """Первые size байт открытого файла - конец файла для парсера"""
+
+    def __init__(self, handle, size):
+        self.handle = handle
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        read = self.handle.readinto(memoryview(buffer)[:size])
+        self.remaining -= read
+        return read
+
+
+def _read_csv_chunks(file_path, dtypes, progress, is_cancelled, chunksize, end=None):
+    total_size = (os.path.getsize(file_path) if end is None else end) or 1
+    chunks = []
+    with open(file_path, 'rb') as handle:
+        source = handle if end is None else io.BufferedReader(_FilePrefix(handle, end))
+        for chunk in pd.read_csv(source, dtype=read_dtypes(dtypes or {}), chunksize=chunksize):
+            if is_cancelled and is_cancelled():
+                raise LoadCancelled()
+            chunks.append(conform_categories(chunk, dtypes or {}))
+            if progress:
+                # Позиция в файле - приблизительная, парсер читает блоками
+                progress(min(99, int(handle.tell() * 100 / total_size)))
+
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
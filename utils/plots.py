@@ -0,0 +1,125 @@
+"""Отрисовка графиков на matplotlib без привязки к Qt.
+
+Функции используются и вкладками приложения, и пакетным режимом
+(diamond_cli.py), который рисует на Agg без дисплея.
+"""
+from matplotlib.artist import setp
+from matplotlib.colors import LogNorm
+import numpy as np
+
+# Начиная с этого числа точек точечный график рисуется как карта плотности
+DENSITY_THRESHOLD = 200_000
+DENSITY_BINS = 200
+
+
+def draw_correlation_bars(ax, corr_matrix, selected_var, intervals=None, method_name=None):
+    """Горизонтальные столбцы корреляций переменной с остальными.
+
+    intervals - {переменная: (нижняя, верхняя граница)} для отметки
+    доверительных интервалов на столбцах.
+    """
+    correlations = corr_matrix[selected_var].sort_values(ascending=False)
+    correlations = correlations[correlations.index != selected_var]  # Убираем саму с собой
+
+    xerr = None
+    if intervals:
+        low = np.array([intervals[var][0] for var in correlations.index])
+        high = np.array([intervals[var][1] for var in correlations.index])
+        xerr = np.abs(np.vstack([correlations.values - low, high - correlations.values]))
+
+    bars = ax.barh(range(len(correlations)), correlations.values, xerr=xerr, capsize=3)
+    ax.set_yticks(range(len(correlations)))
+    ax.set_yticklabels(correlations.index)
+    ax.set_xlabel('Коэффициент корреляции' + (f' ({method_name})' if method_name else ''))
+    ax.set_title(f'Корреляции переменной "{selected_var}" с другими переменными')
+
+    # Добавляем значения на столбцы
+    for i, (bar, value) in enumerate(zip(bars, correlations.values)):
+        ax.text(value + 0.01, i, f'{value:.2f}', va='center')
+
+
+def draw_heatmap(ax, corr_matrix, cmap='coolwarm', annot=True, method_name=None, mixed=False):
+    """Тепловая карта корреляционной матрицы.
+
+    mixed - в матрице есть категориальные колонки (η и V Крамера из
+    utils.association), меняется только заголовок. Возвращает сетку ячеек
+    (QuadMesh) - по ней set_heatmap_cmap меняет схему без перестроения.
+    """
+    # seaborn нужен только для тепловой карты - импортируем при первой отрисовке
+    import seaborn as sns
+    sns.heatmap(corr_matrix,
+                annot=annot,
+                fmt=".2f",
+                cmap=cmap,
+                center=0,
+                square=True,
+                cbar_kws={"shrink": .8},
+                ax=ax)
+
+    if mixed:
+        ax.set_title('Тепловая карта связей переменных'
+                     + (f' ({method_name}; η и V Крамера для категориальных)' if method_name else ''))
+    else:
+        ax.set_title('Тепловая карта корреляций числовых переменных'
+                     + (f' ({method_name})' if method_name else ''))
+
+    # Поворачиваем подписи для лучшей читаемости
+    setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
+    setp(ax.get_yticklabels(), rotation=0)
+    return ax.collections[0]
+
+
+def set_heatmap_cmap(mesh, texts, cmap):
+    """Меняет цветовую схему построенной тепловой карты на месте.
+
+    Цвет подписей пересчитывается так же, как в seaborn: тёмный текст на
+    светлых ячейках и белый на тёмных. Цветовая шкала обновляется сама.
+    """
+    from seaborn.utils import relative_luminance
+
+    mesh.set_cmap(cmap)
+    mesh.update_scalarmappable()
+    # Подписи есть только у ячеек без пропусков - в том же порядке
+    filled = ~np.ma.getmaskarray(mesh.get_array()).ravel()
+    for text, color in zip(texts, mesh.get_facecolors()[filled]):
+        text.set_color(".15" if relative_luminance(color) > .408 else "w")
+
+
+def draw_histogram(ax, counts, edges, log=False):
+    """Гистограмма по готовым частотам и границам (DatasetAnalysis.histogram)"""
+    ax.stairs(counts, edges, fill=True, alpha=0.7, edgecolor='black')
+    if log:
+        ax.set_xscale('log')
+    # Подмножество фильтра считается по границам всех данных - показываем
+    # только занятые интервалы
+    filled = np.flatnonzero(counts)
+    if len(filled):
+        ax.set_xlim(edges[filled[0]], edges[filled[-1] + 1])
+    ax.set_ylabel('Частота')
+
+
+def draw_category_counts(ax, counts):
+    """Столбцы числа строк по категориям (DatasetAnalysis.category_histogram)"""
+    positions = np.arange(len(counts))
+    ax.bar(positions, counts.to_numpy(), alpha=0.7, edgecolor='black')
+    ax.set_xticks(positions)
+    ax.set_xticklabels([str(value) for value in counts.index])
+    ax.set_ylabel('Количество')
+
+
+def draw_density(figure, ax, counts, extent):
+    """Карта плотности точек по результату DatasetAnalysis.density_grid"""
+    # Пустые ячейки маскируем, чтобы они остались фоном
+    image = ax.imshow(np.ma.masked_equal(counts.T, 0), origin='lower', extent=extent,
+                      aspect='auto', interpolation='nearest', cmap='viridis',
+                      norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)))
+    figure.colorbar(image, ax=ax, label='Количество точек')
+
+
+def draw_trend(ax, regression):
+    """Линия тренда по результату регрессии (прямой хватает двух точек)"""
+    x_ends = np.array([regression.x_min, regression.x_max])
+    ax.plot(x_ends, regression.intercept + regression.slope * x_ends,
+            "r--", alpha=0.8, linewidth=2,
+            label=f'Тренд (R²={regression.r_squared:.3f})')
+    ax.legend()
@@ -0,0 +1,153 @@
+"""Замеры времени и памяти горячих участков кода.
+
+Участок оборачивается контекстным менеджером timed() или декоратором
+profiled(); получившиеся события собираются в recorder (PerfRecorder) и
+рассылаются подписчикам - например, вкладке лога. События можно выгрузить
+в JSON или в формат Chrome trace (chrome://tracing, Perfetto).
+
+Прирост памяти считается через tracemalloc и только когда трассировка
+включена (recorder.set_memory_tracing(True)) - она заметно замедляет код.
+Пик tracemalloc общий для процесса: в замер попадают и выделения других
+потоков, идущие в это время, так что при параллельной работе он приблизительный.
+"""
+from collections import deque, namedtuple
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+PerfEvent = namedtuple('PerfEvent', ['name', 'start', 'duration', 'rows',
+                                     'memory_delta', 'thread_id', 'wall_time'])
+
+
+class _Frame:
+    def __init__(self, base, session):
+        self.base = base
+        self.peak = base
+        self.session = session
+
+
+class PerfRecorder:
+    """Потокобезопасное хранилище событий с ограниченной ёмкостью"""
+
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+        self.listeners = []
+        self.origin = time.perf_counter()
+        self.tracing_session = 0  # номер включения tracemalloc - счётчики сбрасываются при каждом
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def record(self, event):
+        with self._lock:
+            self.events.append(event)
+        for callback in list(self.listeners):
+            callback(event)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.events)
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    @property
+    def memory_tracing(self):
+        return tracemalloc.is_tracing()
+
+    def set_memory_tracing(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            self.tracing_session += 1
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def export_json(self, path):
+        events = [event._asdict() for event in self.snapshot()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'events': events}, f, ensure_ascii=False, indent=2)
+
+    def export_chrome_trace(self, path):
+        """Формат Trace Event: события 'X' с началом и длительностью в микросекундах"""
+        pid = os.getpid()
+        trace = []
+        for event in self.snapshot():
+            args = {'rows': event.rows}
+            if event.memory_delta is not None:
+                args['memory_delta_kb'] = round(event.memory_delta / 1024, 1)
+            trace.append({'name': event.name, 'cat': 'diamond', 'ph': 'X',
+                          'ts': round(event.start * 1e6, 1), 'dur': round(event.duration * 1e6, 1),
+                          'pid': pid, 'tid': event.thread_id, 'args': args})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+
+recorder = PerfRecorder()
+# Открытые замеры памяти всех потоков: tracemalloc.reset_peak() сбрасывает один
+# пик на весь процесс, поэтому перед сбросом пик передаётся каждому из них
+_frames = []
+_frames_lock = threading.Lock()
+
+
+def _propagate_peak(peak):
+    for frame in _frames:
+        frame.peak = max(frame.peak, peak)
+
+
+@contextmanager
+def timed(name, rows=None):
+    """Замеряет участок кода. Число строк можно задать и внутри: info['rows'] = ..."""
+    info = {'rows': rows}
+    tracing = tracemalloc.is_tracing()
+    frame = None
+
+    if tracing:
+        with _frames_lock:
+            # Перед сбросом пика передаем его во все открытые замеры (и других потоков)
+            current, peak = tracemalloc.get_traced_memory()
+            _propagate_peak(peak)
+            tracemalloc.reset_peak()
+            frame = _Frame(current, recorder.tracing_session)
+            _frames.append(frame)
+
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        duration = time.perf_counter() - start
+        memory_delta = None
+        if frame is not None:
+            with _frames_lock:
+                _frames.remove(frame)
+                # Слежение могли выключить (или включить заново) внутри участка -
+                # тогда начальное значение уже не сравнимо и память не сообщаем
+                if tracemalloc.is_tracing() and frame.session == recorder.tracing_session:
+                    _, peak = tracemalloc.get_traced_memory()
+                    _propagate_peak(peak)
+                    memory_delta = max(frame.peak, peak) - frame.base
+        recorder.record(PerfEvent(name, start - recorder.origin, duration, info['rows'],
+                                  memory_delta, threading.get_ident(), time.time()))
+
+
+def profiled(name=None):
+    """Декоратор для методов вкладок: число строк берется из self.df"""
+    def decorator(func):
+        event_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            df = getattr(self, 'df', None)
+            with timed(event_name, rows=len(df) if df is not None else None):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
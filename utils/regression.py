@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+import numpy as np
+
+RegressionResult = namedtuple('RegressionResult', [
+    'n', 'slope', 'intercept', 'r', 'r_squared',
+    'slope_stderr', 'intercept_stderr', 'p_value', 'x_min', 'x_max',
+])
+
+# Размер порции для подсчёта сумм (чтобы промежуточные массивы не росли с данными)
+CHUNK_SIZE = 1_000_000
+
+
+class RegressionStats:
+    """Достаточные статистики парной линейной регрессии y = a + b*x.
+
+    Хранит n, средние и центрированные суммы Sxx, Syy, Sxy. Порции данных
+    добавляются через update, а статистики двух частей объединяются через
+    merge (формулы Чана), поэтому данные можно обрабатывать кусками.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0
+        self.x_min = np.inf
+        self.x_max = -np.inf
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        if len(x) == 0:
+            return self
+
+        part = RegressionStats()
+        part.n = len(x)
+        part.mean_x = x.mean()
+        part.mean_y = y.mean()
+        dx = x - part.mean_x
+        dy = y - part.mean_y
+        part.sxx = dx @ dx
+        part.syy = dy @ dy
+        part.sxy = dx @ dy
+        part.x_min = x.min()
+        part.x_max = x.max()
+        return self.merge(part)
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.sxx += other.sxx + dx * dx * weight
+        self.syy += other.syy + dy * dy * weight
+        self.sxy += other.sxy + dx * dy * weight
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.x_min = min(self.x_min, other.x_min)
+        self.x_max = max(self.x_max, other.x_max)
+        self.n = n
+        return self
+
+    def result(self):
+        n = self.n
+        if n < 2 or self.sxx == 0:
+            return RegressionResult(n, np.nan, np.nan, np.nan, np.nan,
+                                    np.nan, np.nan, np.nan, self.x_min, self.x_max)
+
+        slope = self.sxy / self.sxx
+        intercept = self.mean_y - slope * self.mean_x
+        r = self.sxy / np.sqrt(self.sxx * self.syy) if self.syy > 0 else np.nan
+        r_squared = r ** 2
+
+        slope_stderr = intercept_stderr = p_value = np.nan
+        if n > 2:
+            # Остаточная дисперсия и t-критерий для наклона
+            residual = max(self.syy - slope * self.sxy, 0.0) / (n - 2)
+            slope_stderr = np.sqrt(residual / self.sxx)
+            intercept_stderr = np.sqrt(residual * (1.0 / n + self.mean_x ** 2 / self.sxx))
+            if slope_stderr > 0:
+                # scipy нужен только здесь - импортируем при первом расчете
+                from scipy import stats
+                p_value = 2 * stats.t.sf(abs(slope / slope_stderr), n - 2)
+            else:
+                p_value = 0.0
+
+        return RegressionResult(n, slope, intercept, r, r_squared, slope_stderr,
+                                intercept_stderr, p_value, self.x_min, self.x_max)
+
+
+def linear_regression(x, y, chunksize=CHUNK_SIZE):
+    """Регрессия y по x за один проход по данным (порциями)"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    acc = RegressionStats()
+    for start in range(0, len(x), chunksize):
+        acc.update(x[start:start + chunksize], y[start:start + chunksize])
+    return acc.result()
@@ -0,0 +1,122 @@
+"""Отчёты по набору данных без графического интерфейса.
+
+Считает те же таблицы, что показывают вкладки приложения, и сохраняет их
+в CSV/JSON, а графики - в PNG через бэкенд Agg (Qt не импортируется).
+"""
+import json
+import os
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import pandas as pd
+
+from utils.analysis import DatasetAnalysis
+from utils.regression import RegressionResult
+from utils.schema import widen_float32
+from utils.plots import (draw_heatmap, draw_density, draw_trend,
+                         DENSITY_THRESHOLD, DENSITY_BINS)
+
+# Как раскладывать таблицы в JSON (по умолчанию - словарь по строкам)
+JSON_ORIENT = {'top_correlations': 'records', 'regressions': 'records',
+               'batch_correlations': 'records'}
+
+
+def default_pairs(analysis):
+    """По умолчанию строим регрессию price по каждой числовой колонке"""
+    columns = analysis.numeric_columns
+    if 'price' not in columns:
+        return []
+    return [(col, 'price') for col in columns if col != 'price']
+
+
+def analyze(df, pairs=None, top=3):
+    """Возвращает (DatasetAnalysis, {имя таблицы: DataFrame})"""
+    analysis = DatasetAnalysis(df)
+    if pairs is None:
+        pairs = default_pairs(analysis)
+
+    missing = df.isnull().sum()
+    tables = {
+        'statistics': analysis.describe(),
+        'missing': pd.DataFrame({'missing': missing,
+                                 'percent': missing / max(len(df), 1) * 100}),
+        'unique': pd.DataFrame({'unique': df.nunique()}),
+        'correlation': analysis.corr(),
+        'top_correlations': pd.DataFrame(analysis.top_correlations(top),
+                                         columns=['var1', 'var2', 'r']),
+        'regressions': pd.DataFrame(
+            [dict(x=x, y=y, **regression_row(analysis, x, y)) for x, y in pairs],
+            columns=['x', 'y'] + list(RegressionResult._fields)),
+    }
+    return analysis, tables
+
+
+def regression_row(analysis, x, y):
+    row = analysis.regression(x, y)._asdict()
+    if analysis.df[x].dtype == 'float32':
+        # Границы X - значения колонки float32; в отчёт - их десятичная запись
+        row['x_min'], row['x_max'] = widen_float32([row['x_min'], row['x_max']])
+    return row
+
+
+def write_tables(tables, out_dir, formats=('csv', 'json'), meta=None, json_name='report.json'):
+    """Сохраняет таблицы как <имя>.csv и/или общий JSON-отчёт"""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    if 'csv' in formats:
+        for name, frame in tables.items():
+            path = os.path.join(out_dir, f'{name}.csv')
+            frame.to_csv(path)
+            written.append(path)
+    if 'json' in formats:
+        report = dict(meta or {})
+        for name, frame in tables.items():
+            orient = JSON_ORIENT.get(name, 'index')
+            report[name] = json.loads(frame.to_json(orient=orient, default_handler=str))
+        path = os.path.join(out_dir, json_name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        written.append(path)
+    return written
+
+
+def new_figure(figsize=(10, 8)):
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def render_figures(analysis, out_dir, pairs=None, cmap='coolwarm'):
+    """Рисует тепловую карту и графики регрессий в PNG"""
+    os.makedirs(out_dir, exist_ok=True)
+    if pairs is None:
+        pairs = default_pairs(analysis)
+    written = []
+
+    if len(analysis.numeric_columns) > 1:
+        figure = new_figure()
+        draw_heatmap(figure.add_subplot(111), analysis.corr(), cmap=cmap, annot=True)
+        figure.tight_layout()
+        path = os.path.join(out_dir, 'heatmap.png')
+        figure.savefig(path)
+        written.append(path)
+
+    df = analysis.df
+    for x, y in pairs:
+        figure = new_figure()
+        ax = figure.add_subplot(111)
+        if len(df) > DENSITY_THRESHOLD:
+            counts, extent = analysis.density_grid(x, y, bins=DENSITY_BINS)
+            draw_density(figure, ax, counts, extent)
+        else:
+            ax.scatter(df[x], df[y], alpha=0.5, s=10)
+        draw_trend(ax, analysis.regression(x, y))
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        ax.set_title(f'Зависимость {y} от {x}')
+        figure.tight_layout()
+        path = os.path.join(out_dir, f'regression_{x}_{y}.png')
+        figure.savefig(path)
+        written.append(path)
+
+    return written
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Порядок категорий - от худшего качества к лучшему
+CUT_ORDER = ['Fair', 'Good', 'Very Good', 'Premium', 'Ideal']
+COLOR_ORDER = ['J', 'I', 'H', 'G', 'F', 'E', 'D']
+CLARITY_ORDER = ['I1', 'SI2', 'SI1', 'VS2', 'VS1', 'VVS2', 'VVS1', 'IF']
+
+# Схема колонок diamonds.csv
+DIAMONDS_DTYPES = {
+    'carat': 'float32',
+    'cut': pd.CategoricalDtype(CUT_ORDER, ordered=True),
+    'color': pd.CategoricalDtype(COLOR_ORDER, ordered=True),
+    'clarity': pd.CategoricalDtype(CLARITY_ORDER, ordered=True),
+    'depth': 'float32',
+    'table': 'float32',
+    'x': 'float32',
+    'y': 'float32',
+    'z': 'float32',
+    'price': 'int32',
+}
+
+
+class SchemaMismatch(ValueError):
+    """В категориальной колонке есть значения вне объявленного списка категорий"""
+
+
+# Строки describe(), в которых стоят сами значения колонки (а не суммы)
+ORDER_STATS = ['min', '25%', '50%', '75%', 'max']
+
+
+def widen_float32(values):
+    """float32 -> float64 по кратчайшей десятичной записи значения.
+
+    float32 - только формат хранения: в таблицах и отчётах 0.2 должно
+    остаться 0.2, а не 0.20000000298023224. Для небольших массивов
+    (статистики, границы), не для целых колонок.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    return np.array([float(str(value)) for value in values.ravel()]).reshape(values.shape)
+
+
+def widen_stats(stats, dtypes):
+    """Приводит строки ORDER_STATS таблицы describe() колонок float32 к float64"""
+    rows = [row for row in ORDER_STATS if row in stats.index]
+    for col, dtype in dtypes.items():
+        if col in stats.columns and dtype == np.float32:
+            stats.loc[rows, col] = widen_float32(stats.loc[rows, col].to_numpy(dtype=np.float64))
+    return stats
+
+
+def schema_for(columns):
+    """Возвращает типы из схемы только для колонок, которые есть в файле"""
+    return {col: dtype for col, dtype in DIAMONDS_DTYPES.items() if col in columns}
+
+
+def read_dtypes(dtypes):
+    """Типы для pd.read_csv: категориальные колонки читаются как 'category'
+    без списка категорий, иначе неизвестное значение молча стало бы NaN"""
+    return {col: 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype
+            for col, dtype in dtypes.items()}
+
+
+def conform_categories(df, dtypes):
+    """Приводит категориальные колонки df к объявленным категориям.
+
+    Значение вне списка (опечатка, другая градация вроде "Very good")
+    вызывает SchemaMismatch вместо тихой замены на NaN.
+    """
+    for col, dtype in dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype) or col not in df.columns:
+            continue
+        series = df[col]
+        values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) \
+            else pd.Index(series.dropna().unique())
+        unknown = values.difference(dtype.categories)
+        if len(unknown):
+            raise SchemaMismatch(
+                f"Колонка {col}: неизвестные значения {', '.join(map(str, unknown[:5]))} "
+                f"(ожидаются {', '.join(map(str, dtype.categories))})")
+        df[col] = series.astype(dtype)
+    return df
+
+
+def apply_schema(df):
+    """Приводит уже загруженный DataFrame к схеме (например, после Excel).
+
+    Если значения не укладываются в схему, df возвращается как есть, а
+    причина записывается в df.attrs['schema_warning'].
+    """
+    dtypes = schema_for(df.columns)
+    if not dtypes:
+        return df
+    try:
+        converted = df.astype({col: dtype for col, dtype in dtypes.items()
+                               if not isinstance(dtype, pd.CategoricalDtype)})
+        return conform_categories(converted, dtypes)
+    except (ValueError, TypeError) as e:
+        # Данные не укладываются в схему (пропуски в price и т.п.) - оставляем как есть
+        df.attrs['schema_warning'] = str(e)
+        return df
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """Сливаемый скетч квантилей (упрощённый KLL).
+
+    Значения хранятся по уровням: элемент уровня i "весит" 2**i. Когда на
+    уровне накапливается больше k элементов, они сортируются и каждый второй
+    переносится на следующий уровень. Память - O(k * log(n / k)),
+    ошибка ранга - порядка 1/k.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for i, level in enumerate(other.levels):
+            self.levels[i] = np.concatenate([self.levels[i], level])
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, qs):
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** i)
+                                  for i, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side='left')
+        return values[np.minimum(positions, len(values) - 1)]
+
+    def _compress(self):
+        i = 0
+        while i < len(self.levels):
+            level = self.levels[i]
+            if len(level) > self.k:
+                level = np.sort(level)
+                # Нечётный остаток остаётся на текущем уровне
+                keep = level[len(level) - len(level) % 2:]
+                level = level[:len(level) - len(level) % 2]
+                promoted = level[self._rng.integers(2)::2]
+                self.levels[i] = keep
+                if i + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[i + 1] = np.concatenate([self.levels[i + 1], promoted])
+            i += 1
+
+
+class HyperLogLog:
+    """Оценка числа различных значений за постоянную память (HyperLogLog).
+
+    Хэш значения делится на номер регистра (старшие p бит) и остаток; в
+    регистре хранится максимальная позиция первой единицы в остатке. Память -
+    2**p байт, относительная ошибка - около 1.04 / sqrt(2**p) (0.8% при p=14).
+    Скетчи с одинаковым p сливаются поэлементным максимумом.
+    """
+
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(self.m)
+
+    def update(self, values):
+        values = pd.Series(values).dropna().to_numpy()
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(values)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Длина остатка в битах через показатель степени float64 (остаток < 2**53)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = ((64 - self.p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            # Малые мощности - линейный подсчёт по пустым регистрам
+            return int(round(self.m * np.log(self.m / zeros)))
+        return int(round(raw))
+
+
+class SpaceSaving:
+    """Самые частые значения (heavy hitters) за O(k) памяти.
+
+    Порция данных сворачивается в точные частоты, затем сливается со сводкой
+    по правилу сливаемого SpaceSaving: значению, которого нет в заполненной
+    сводке, приписывается её минимальная частота. Оценки частот завышены не
+    больше чем на errors - значения с counts - errors выше любой чужой
+    оценки гарантированно входят в top.
+    """
+
+    def __init__(self, k=256):
+        self.k = k
+        self.counts = pd.Series(dtype=np.float64)
+        self.errors = pd.Series(dtype=np.float64)
+
+    def _floor(self):
+        return self.counts.min() if len(self.counts) >= self.k else 0.0
+
+    def update(self, values):
+        counts = pd.Series(values).value_counts(dropna=True)
+        counts = counts[counts > 0].astype(np.float64)
+        self._merge(counts, pd.Series(0.0, index=counts.index), 0.0)
+
+    def merge(self, other):
+        self._merge(other.counts, other.errors, other._floor())
+
+    def _merge(self, counts, errors, floor):
+        if len(counts) == 0:
+            return
+        own_floor = self._floor()
+        index = self.counts.index.union(counts.index)
+        total = self.counts.reindex(index).fillna(own_floor) + counts.reindex(index).fillna(floor)
+        error = self.errors.reindex(index).fillna(own_floor) + errors.reindex(index).fillna(floor)
+        top = total.nlargest(self.k).index
+        self.counts = total[top]
+        self.errors = error[top]
+
+    def top(self, n=10):
+        """Самые частые значения: DataFrame с оценкой частоты и её погрешностью"""
+        # nlargest уже упорядочил сводку по убыванию оценки
+        return pd.DataFrame({'count': self.counts.iloc[:n], 'error': self.errors.iloc[:n]})
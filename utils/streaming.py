@@ -0,0 +1,196 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.io import CHUNK_SIZE, LoadCancelled
+from utils.profiling import timed
+from utils.schema import schema_for, read_dtypes, widen_stats
+from utils.sketches import QuantileSketch, HyperLogLog, SpaceSaving
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+
+class StreamingStats:
+    """Статистики, которые обновляются порциями данных без хранения самих данных.
+
+    Для числовых колонок - количество, среднее и дисперсия (объединение по
+    Уэлфорду/Чану), min/max и скетч квантилей, а также матрица совместных
+    моментов для корреляций (попарно по строкам без пропусков в паре, как
+    DataFrame.corr() и utils.correlation), а также приближённые
+    число различных значений (HyperLogLog) и частые значения (SpaceSaving).
+    Для остальных - точные частоты значений. Для всех колонок считаются пропуски.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = []
+        self.dtypes = {}
+        self.missing = {}
+        self.numeric = {}      # колонка -> [n, mean, M2, min, max]
+        self.sketches = {}     # колонка -> QuantileSketch
+        self.frequencies = {}  # колонка -> pd.Series частот
+        self.distinct = {}     # числовая колонка -> HyperLogLog
+        self.heavy = {}        # числовая колонка -> SpaceSaving
+        self.cov_columns = []  # числовые колонки матрицы совместных моментов
+        self.cov_n = None      # [i, j] - число строк, где есть обе колонки
+        self.cov_mean = None   # [i, j] - среднее колонки i по этим строкам
+        self.cov_m2 = None     # [i, j] - сумма квадратов отклонений колонки i
+        self.comoment = None
+
+    def update(self, chunk):
+        if not self.columns:
+            self.columns = list(chunk.columns)
+            self.dtypes = chunk.dtypes.to_dict()
+            self.cov_columns = [col for col in chunk.columns
+                                if pd.api.types.is_numeric_dtype(chunk[col].dtype)]
+
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            series = chunk[col]
+            self.missing[col] = self.missing.get(col, 0) + int(series.isna().sum())
+            if pd.api.types.is_numeric_dtype(series.dtype):
+                self._update_numeric(col, series)
+            else:
+                counts = series.value_counts(dropna=True)
+                if col in self.frequencies:
+                    counts = self.frequencies[col].add(counts, fill_value=0)
+                self.frequencies[col] = counts
+        self._update_comoment(chunk)
+
+    def _update_comoment(self, chunk):
+        if not self.cov_columns:
+            return
+        block = chunk[self.cov_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(block)
+        if not valid.any():
+            return
+
+        # Моменты порции попарно, как в utils.correlation.pearson_matrix: для пары
+        # (i, j) - по строкам, где есть обе колонки; [i, j] - величины колонки i
+        # Сдвиг - среднее колонки в порции; колонка целиком из пропусков
+        # (частое дело в маленьких порциях слежения) получает 0 без предупреждений
+        filled = np.where(valid, block, 0)
+        present = valid.sum(axis=0)
+        shift = filled.sum(axis=0) / np.maximum(present, 1)
+        centered = np.where(valid, filled - shift, 0)
+        mask = valid.astype(np.float64)
+        n_b = mask.T @ mask
+        sums = centered.T @ mask
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, shift[:, None] + sums / n_b, 0)
+            m2_b = np.where(n_b > 0, (centered * centered).T @ mask - sums * sums / n_b, 0)
+            comoment_b = np.where(n_b > 0, centered.T @ centered - sums * sums.T / n_b, 0)
+        if self.cov_n is None:
+            self.cov_n, self.cov_mean, self.cov_m2, self.comoment = n_b, mean_b, m2_b, comoment_b
+            return
+
+        # Объединение по Чану для каждой пары отдельно
+        n = self.cov_n + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, self.cov_n * n_b / n, 0)
+            share = np.where(n > 0, n_b / n, 0)
+        delta = mean_b - self.cov_mean
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.cov_m2 = self.cov_m2 + m2_b + delta * delta * weight
+        self.cov_mean = self.cov_mean + delta * share
+        self.cov_n = n
+
+    def _update_numeric(self, col, series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        self.sketches.setdefault(col, QuantileSketch()).update(values)
+        self.distinct.setdefault(col, HyperLogLog()).update(series)
+        self.heavy.setdefault(col, SpaceSaving()).update(series)
+        if len(values) == 0:
+            return
+
+        n_b = len(values)
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        min_b, max_b = values.min(), values.max()
+
+        if col not in self.numeric:
+            self.numeric[col] = [n_b, mean_b, m2_b, min_b, max_b]
+            return
+
+        n_a, mean_a, m2_a, min_a, max_a = self.numeric[col]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        self.numeric[col] = [n,
+                             mean_a + delta * n_b / n,
+                             m2_a + m2_b + delta ** 2 * n_a * n_b / n,
+                             min(min_a, min_b),
+                             max(max_a, max_b)]
+
+    def describe(self):
+        """Таблица в формате DataFrame.describe() (числовые + категориальные).
+
+        Квартили берутся из скетча и приближённые - их строки перечислены
+        в attrs['approximate'].
+        """
+        numeric = {}
+        for col in self.columns:
+            if col not in self.sketches:
+                continue
+            n, mean, m2, min_v, max_v = self.numeric.get(col, [0, np.nan, np.nan, np.nan, np.nan])
+            std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+            q25, q50, q75 = self.sketches[col].quantiles(QUANTILES)
+            numeric[col] = [n, mean, std, min_v, q25, q50, q75, max_v]
+        numeric_stats = pd.DataFrame(numeric, index=['count', 'mean', 'std', 'min',
+                                                     '25%', '50%', '75%', 'max'])
+        numeric_stats = widen_stats(numeric_stats, self.dtypes)
+
+        categorical = {}
+        for col, counts in self.frequencies.items():
+            counts = counts[counts > 0]
+            if len(counts):
+                top = counts.idxmax()
+                categorical[col] = [int(counts.sum()), len(counts), top, int(counts[top])]
+            else:
+                categorical[col] = [0, 0, np.nan, np.nan]
+        categorical_stats = pd.DataFrame(categorical, index=['count', 'unique', 'top', 'freq'])
+
+        stats = pd.concat([numeric_stats, categorical_stats], axis=1)
+        stats.attrs['approximate'] = ['25%', '50%', '75%']
+        return stats
+
+    def corr(self):
+        """Корреляционная матрица Пирсона из накопленных совместных моментов"""
+        if self.comoment is None:
+            return pd.DataFrame(index=self.cov_columns, columns=self.cov_columns, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.clip(self.comoment / np.sqrt(self.cov_m2 * self.cov_m2.T), -1.0, 1.0)
+        corr[self.cov_n < 2] = np.nan
+        return pd.DataFrame(corr, index=self.cov_columns, columns=self.cov_columns)
+
+    def pair_counts(self):
+        """Число строк без пропусков для каждой пары колонок corr()"""
+        if self.cov_n is None:
+            return np.zeros((len(self.cov_columns),) * 2, dtype=np.int64)
+        return self.cov_n.astype(np.int64)
+
+    def missing_counts(self):
+        return pd.Series(self.missing, dtype='int64').reindex(self.columns)
+
+
+def stream_file_stats(file_path, progress=None, is_cancelled=None, chunksize=CHUNK_SIZE):
+    """Читает CSV порциями и возвращает StreamingStats; память не растёт с размером файла"""
+    total_size = os.path.getsize(file_path) or 1
+    with open(file_path, 'rb') as handle:
+        # Категории без объявленного списка: неизвестные значения тоже попадут в частоты
+        dtypes = read_dtypes(schema_for(pd.read_csv(handle, nrows=0).columns))
+
+    stats = StreamingStats()
+    with timed('stream_file_stats') as info, open(file_path, 'rb') as handle:
+        for chunk in pd.read_csv(handle, dtype=dtypes, chunksize=chunksize):
+            if is_cancelled and is_cancelled():
+                raise LoadCancelled()
+            stats.update(chunk)
+            if progress:
+                progress(min(99, int(handle.tell() * 100 / total_size)))
+        info['rows'] = stats.rows
+
+    if progress:
+        progress(100)
+    return stats
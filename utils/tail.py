@@ -0,0 +1,57 @@
+import io
+import os
+
+import pandas as pd
+
+from utils.schema import SchemaMismatch, conform_categories, read_dtypes
+
+
+class FileTruncated(Exception):
+    """Файл стал короче прочитанного - дописыванием это не объяснить, нужна полная загрузка"""
+
+
+class CsvTail:
+    """Чтение строк, дописанных в конец CSV после уже загруженной части.
+
+    offset - сколько байт файла уже разобрано. read_new() читает только байты
+    после offset и разбирает их как строки CSV с теми же колонками и типами,
+    что у загруженных данных. Незаконченная последняя строка (запись в файл
+    ещё идёт) остаётся на следующий раз.
+    """
+
+    def __init__(self, file_path, offset, columns, dtypes=None):
+        self.file_path = file_path
+        self.offset = offset
+        self.columns = list(columns)
+        self.dtypes = dtypes
+
+    def read_new(self):
+        """Возвращает DataFrame с новыми строками или None, если дописанного нет"""
+        size = os.path.getsize(self.file_path)
+        if size < self.offset:
+            raise FileTruncated(self.file_path)
+        if size == self.offset:
+            return None
+
+        with open(self.file_path, 'rb') as handle:
+            handle.seek(self.offset)
+            data = handle.read(size - self.offset)
+
+        end = data.rfind(b'\n')
+        if end < 0:
+            return None
+        data = data[:end + 1]
+        self.offset += len(data)
+
+        # Пустые строки (например, перевод строки после последней записи
+        # исходного файла) парсер пропускает сам. Строки, не подходящие под
+        # типы загруженных данных (неизвестная категория, пропуск в целой
+        # колонке и т.п.), не дописываются с другими типами - нужна полная загрузка
+        try:
+            rows = pd.read_csv(io.BytesIO(data), header=None, names=self.columns,
+                               dtype=read_dtypes(self.dtypes or {}))
+        except (ValueError, TypeError) as e:
+            if not self.dtypes:
+                raise
+            raise SchemaMismatch(f"Новые строки не подходят под типы колонок: {e}") from e
+        return conform_categories(rows, self.dtypes or {})
@@ -1,18 +1,19 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QComboBox, QPushButton, QMessageBox)
 from PyQt5.QtCore import Qt
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import numpy as np
+
+from utils.analysis import DatasetAnalysis
+from utils.correlation import METHOD_NAMES, interval
+from utils.profiling import profiled, timed
+from utils.plots import draw_correlation_bars
+from widgets.render_cache import RenderCache
 
 
 class CorrelationTab(QWidget):
     def __init__(self):
         super().__init__()
         self.df = None
+        self.analysis = None
         self.numeric_columns = []
         self.initUI()
 
@@ -34,6 +35,13 @@ class CorrelationTab(QWidget):
         self.var_combo.setMinimumWidth(200)
         control_layout.addWidget(self.var_combo)
 
+        # Метод корреляции
+        control_layout.addWidget(QLabel("Метод:"))
+        self.method_combo = QComboBox()
+        for method, name in METHOD_NAMES.items():
+            self.method_combo.addItem(name, method)
+        control_layout.addWidget(self.method_combo)
+
         # Кнопка построения графика
         self.plot_btn = QPushButton("Построить графики")
         self.plot_btn.clicked.connect(self.plot_correlation)
@@ -48,9 +56,9 @@ class CorrelationTab(QWidget):
         layout.addLayout(control_layout)
 
         # Область для графиков
-        self.figure = Figure(figsize=(10, 8))
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        self.render_cache = RenderCache(figsize=(10, 8))
+        self.figure = self.render_cache.figure
+        layout.addWidget(self.render_cache.widget)
 
         # Информационная метка
         self.info_label = QLabel("Выберите переменные для построения графиков корреляции")
@@ -64,11 +72,14 @@ class CorrelationTab(QWidget):
         self.plot_btn.setEnabled(False)
         self.reset_btn.setEnabled(False)
 
-    def update_data(self, df):
+    def update_data(self, df, analysis=None):
         self.df = df
+        if analysis is not self.analysis:
+            self.render_cache.clear()
+        self.analysis = analysis or DatasetAnalysis(df)
         if self.df is not None:
             # Получаем только числовые колонки
-            self.numeric_columns = self.df.select_dtypes(include=[np.number]).columns.tolist()
+            self.numeric_columns = self.analysis.numeric_columns
             self.var_combo.clear()
             self.var_combo.addItems(self.numeric_columns)
 
@@ -79,6 +90,7 @@ class CorrelationTab(QWidget):
             else:
                 self.info_label.setText("Нет числовых переменных для анализа")
 
+    @profiled()
     def plot_correlation(self):
         if self.df is None or not self.numeric_columns:
             QMessageBox.warning(self, "Ошибка", "Нет данных для построения графиков")
@@ -86,37 +98,41 @@ class CorrelationTab(QWidget):
 
         selected_var = self.var_combo.currentText()
 
+        method = self.method_combo.currentData()
+        key = (self.analysis.version, selected_var, method)
+        state = self.render_cache.restore(key)
+        if state is not None:
+            # Тот же график уже строился - показываем сохранённую картинку
+            self.figure = self.render_cache.figure
+            self.info_label.setText(state['info'])
+            return
+
         try:
-            # Очищаем предыдущий график
-            self.figure.clear()
+            # Новый график строится на новой фигуре - прежние остаются в кэше
+            self.figure = self.render_cache.new_figure()
 
             # Создаем subplot
             ax = self.figure.add_subplot(111)
 
-            # Строим pairplot для выбранной переменной со всеми остальными
-            numeric_df = self.df[self.numeric_columns]
-
             # Если выбрана одна переменная, строим корреляции с остальными
             if selected_var:
-                # Вычисляем корреляции
-                correlations = numeric_df.corr()[selected_var].sort_values(ascending=False)
-                correlations = correlations[correlations.index != selected_var]  # Убираем самую с собой
-
-                # Строим барплот корреляций
-                bars = ax.barh(range(len(correlations)), correlations.values)
-                ax.set_yticks(range(len(correlations)))
-                ax.set_yticklabels(correlations.index)
-                ax.set_xlabel('Коэффициент корреляции')
-                ax.set_title(f'Корреляции переменной "{selected_var}" с другими переменными')
-
-                # Добавляем значения на столбцы
-                for i, (bar, value) in enumerate(zip(bars, correlations.values)):
-                    ax.text(value + 0.01, i, f'{value:.2f}', va='center')
-
-                self.info_label.setText(f"Показаны корреляции переменной '{selected_var}' с другими переменными")
+                # Берём столбец из общей (закэшированной) корреляционной матрицы
+                result = self.analysis.correlation(method)
+                intervals = {var: interval(result, selected_var, var)
+                             for var in result.matrix.columns if var != selected_var}
+                draw_correlation_bars(ax, result.matrix, selected_var, intervals,
+                                      method_name=METHOD_NAMES[method])
+
+                info_text = (f"Показаны корреляции переменной '{selected_var}' с другими переменными "
+                             f"({METHOD_NAMES[method]}, отрезки - 95% доверительные интервалы)")
+                if result.sample_size:
+                    info_text += f"; выборка {result.sample_size} строк"
+                self.info_label.setText(info_text)
+                self.render_cache.store(key, {'info': info_text})
 
             self.figure.tight_layout()
-            self.canvas.draw()
+            with timed('CorrelationTab.canvas.draw', rows=len(self.df)):
+                self.figure.canvas.draw()
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось построить график: {str(e)}")
@@ -124,6 +140,7 @@ class CorrelationTab(QWidget):
 
     def reset_selection(self):
         self.var_combo.setCurrentIndex(0)
-        self.figure.clear()
-        self.canvas.draw()
+        # Пустая фигура вместо очистки текущей - построенные графики остаются в кэше
+        self.figure = self.render_cache.new_figure()
+        self.figure.canvas.draw()
         self.info_label.setText("Выберите переменные для построения графиков корреляции")
\ No newline at end of file
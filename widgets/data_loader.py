@@ -0,0 +1,79 @@
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.io import load_dataframe, complete_lines_end, LoadCancelled
+from utils.streaming import stream_file_stats
+
+
+class DataLoader(QThread):
+    """Фоновая загрузка файла данных, чтобы не блокировать интерфейс"""
+
+    progress = pyqtSignal(int)
+    loaded = pyqtSignal(object, str)  # DataFrame, путь к файлу
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, cache=None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.cache = cache
+        self.from_cache = False
+        self.file_size = None  # Размер прочитанного файла - с него начинается слежение за дописыванием
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        try:
+            # Граница - до разбора и по концу последней целой строки: строки,
+            # дописанные во время загрузки (и недописанная последняя), не читаются
+            # здесь, а достаются слежению за файлом начиная с этого смещения
+            file_size = os.path.getsize(self.file_path)
+            if self.file_path.endswith('.csv'):
+                file_size = complete_lines_end(self.file_path, file_size)
+            self.from_cache = self.cache is not None and self.cache.contains(self.file_path)
+            df = load_dataframe(self.file_path,
+                                progress=self.progress.emit,
+                                is_cancelled=self.isInterruptionRequested,
+                                cache=self.cache,
+                                end=file_size if self.file_path.endswith('.csv') else None)
+            self.file_size = file_size
+        except LoadCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        self.loaded.emit(df, self.file_path)
+
+
+class StreamingStatsLoader(QThread):
+    """Потоковый подсчёт статистики по файлу, который не помещается в память"""
+
+    progress = pyqtSignal(int)
+    loaded = pyqtSignal(object, str)  # StreamingStats, путь к файлу
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def cancel(self):
+        self.requestInterruption()
+
+    def run(self):
+        try:
+            stats = stream_file_stats(self.file_path,
+                                      progress=self.progress.emit,
+                                      is_cancelled=self.isInterruptionRequested)
+        except LoadCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        self.loaded.emit(stats, self.file_path)
@@ -0,0 +1,150 @@
+from PyQt5.QtWidgets import (QGroupBox, QHBoxLayout, QLabel, QToolButton, QMenu,
+                             QComboBox, QDoubleSpinBox, QCheckBox, QPushButton)
+from PyQt5.QtCore import pyqtSignal
+
+
+class FilterPanel(QGroupBox):
+    """Общий фильтр строк для всех вкладок.
+
+    Для каждой категориальной колонки - меню с отметками значений, плюс один
+    диапазон по числовой колонке. Сам отбор строк делает
+    DatasetAnalysis.subset() по заранее построенным индексам.
+    """
+
+    filter_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__("🔎 Фильтр", parent)
+        self.category_menus = {}  # колонка -> (кнопка, меню)
+        self.ranges = {}          # колонка -> (min, max)
+        self.initUI()
+        self.setEnabled(False)
+
+    def initUI(self):
+        layout = QHBoxLayout(self)
+
+        self.categories_layout = QHBoxLayout()
+        layout.addLayout(self.categories_layout)
+
+        self.range_check = QCheckBox("Диапазон:")
+        layout.addWidget(self.range_check)
+
+        self.range_column = QComboBox()
+        self.range_column.currentTextChanged.connect(self.on_range_column_changed)
+        layout.addWidget(self.range_column)
+
+        layout.addWidget(QLabel("от"))
+        self.range_low = QDoubleSpinBox()
+        self.range_low.setDecimals(2)
+        layout.addWidget(self.range_low)
+
+        layout.addWidget(QLabel("до"))
+        self.range_high = QDoubleSpinBox()
+        self.range_high.setDecimals(2)
+        layout.addWidget(self.range_high)
+
+        apply_btn = QPushButton("Применить")
+        apply_btn.clicked.connect(self.filter_changed.emit)
+        layout.addWidget(apply_btn)
+
+        reset_btn = QPushButton("Сбросить")
+        reset_btn.clicked.connect(self.reset)
+        layout.addWidget(reset_btn)
+
+        self.rows_label = QLabel("")
+        layout.addWidget(self.rows_label)
+        layout.addStretch()
+
+    def set_data(self, df):
+        """Перестраивает элементы фильтра под колонки загруженных данных"""
+        for button, _ in self.category_menus.values():
+            self.categories_layout.removeWidget(button)
+            button.deleteLater()
+        self.category_menus = {}
+        self.ranges = {}
+
+        for col in df.columns:
+            dtype = df[col].dtype
+            if hasattr(dtype, 'categories'):
+                self.add_category_menu(col, list(dtype.categories))
+            elif dtype.kind in 'iuf':
+                self.ranges[col] = (float(df[col].min()), float(df[col].max()))
+
+        self.range_column.blockSignals(True)
+        self.range_column.clear()
+        self.range_column.addItems(list(self.ranges))
+        self.range_column.blockSignals(False)
+        self.range_check.setChecked(False)
+        self.on_range_column_changed(self.range_column.currentText())
+
+        self.rows_label.setText(f"Строк: {len(df)}")
+        self.setEnabled(True)
+
+    def add_category_menu(self, col, values):
+        button = QToolButton()
+        button.setPopupMode(QToolButton.InstantPopup)
+        menu = QMenu(button)
+        for value in values:
+            action = menu.addAction(str(value))
+            action.setData(value)
+            action.setCheckable(True)
+            action.setChecked(True)
+            action.toggled.connect(lambda _, col=col: self.update_category_text(col))
+        button.setMenu(menu)
+        self.categories_layout.addWidget(button)
+        self.category_menus[col] = (button, menu)
+        self.update_category_text(col)
+
+    def update_category_text(self, col):
+        button, menu = self.category_menus[col]
+        actions = menu.actions()
+        checked = [action.text() for action in actions if action.isChecked()]
+        if len(checked) == len(actions):
+            button.setText(f"{col}: все")
+        else:
+            button.setText(f"{col}: {', '.join(checked) or 'ничего'}")
+
+    def on_range_column_changed(self, col):
+        if col not in self.ranges:
+            return
+        low, high = self.ranges[col]
+        for spin in (self.range_low, self.range_high):
+            spin.setRange(low, high)
+        self.range_low.setValue(low)
+        self.range_high.setValue(high)
+
+    def spec(self):
+        """Условия фильтра: ({колонка: [значения]}, {колонка: (от, до)})"""
+        categories = {}
+        for col, (_, menu) in self.category_menus.items():
+            actions = menu.actions()
+            checked = [action.data() for action in actions if action.isChecked()]
+            # Отмечено всё - колонку не фильтруем
+            if len(checked) < len(actions):
+                categories[col] = checked
+
+        ranges = {}
+        if self.range_check.isChecked() and self.range_column.currentText():
+            ranges[self.range_column.currentText()] = (self.range_low.value(), self.range_high.value())
+        return categories, ranges
+
+    def describe(self):
+        """Текстовое описание фильтра для лога"""
+        categories, ranges = self.spec()
+        parts = [f"{col} ∈ {{{', '.join(map(str, values))}}}" for col, values in categories.items()]
+        parts += [f"{low:g} ≤ {col} ≤ {high:g}" for col, (low, high) in ranges.items()]
+        return "; ".join(parts) or "нет"
+
+    def set_row_count(self, rows, total):
+        self.rows_label.setText(f"Строк: {rows} из {total}" if rows != total else f"Строк: {total}")
+
+    def reset(self):
+        for col, (_, menu) in self.category_menus.items():
+            for action in menu.actions():
+                action.blockSignals(True)
+                action.setChecked(True)
+                action.blockSignals(False)
+            self.update_category_text(col)
+        self.range_check.setChecked(False)
+        self.on_range_column_changed(self.range_column.currentText())
+        self.filter_changed.emit()
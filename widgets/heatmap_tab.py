@@ -1,19 +1,21 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QCheckBox, QMessageBox, QComboBox)
 from PyQt5.QtCore import Qt
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import numpy as np
+
+from utils.analysis import DatasetAnalysis
+from utils.correlation import METHOD_NAMES, interval
+from utils.profiling import profiled, timed
+from utils.plots import draw_heatmap, set_heatmap_cmap
+from widgets.render_cache import RenderCache
 
 
 class HeatmapTab(QWidget):
     def __init__(self):
         super().__init__()
         self.df = None
+        self.analysis = None
         self.numeric_columns = []
+        self.categorical_columns = []
         self.initUI()
 
     def initUI(self):
@@ -27,18 +29,32 @@ class HeatmapTab(QWidget):
         # Панель управления
         control_layout = QHBoxLayout()
 
+        # Метод корреляции
+        control_layout.addWidget(QLabel("Метод:"))
+        self.method_combo = QComboBox()
+        for method, name in METHOD_NAMES.items():
+            self.method_combo.addItem(name, method)
+        control_layout.addWidget(self.method_combo)
+
         # Выбор цветовой схемы
         control_layout.addWidget(QLabel("Цветовая схема:"))
         self.cmap_combo = QComboBox()
         self.cmap_combo.addItems(['coolwarm', 'viridis', 'plasma', 'RdYlBu', 'Spectral'])
         self.cmap_combo.setCurrentText('coolwarm')
+        self.cmap_combo.currentIndexChanged.connect(self.update_style)
         control_layout.addWidget(self.cmap_combo)
 
         # Чекбокс для аннотаций
         self.annot_check = QCheckBox("Показать значения")
         self.annot_check.setChecked(True)
+        self.annot_check.toggled.connect(self.update_style)
         control_layout.addWidget(self.annot_check)
 
+        # Категориальные колонки: η с числовыми и V Крамера между собой
+        self.categorical_check = QCheckBox("Категориальные (η, V Крамера)")
+        self.categorical_check.setChecked(True)
+        control_layout.addWidget(self.categorical_check)
+
         # Кнопка построения тепловой карты
         self.plot_btn = QPushButton("Построить тепловую карту")
         self.plot_btn.clicked.connect(self.plot_heatmap)
@@ -48,9 +64,10 @@ class HeatmapTab(QWidget):
         layout.addLayout(control_layout)
 
         # Область для графика
-        self.figure = Figure(figsize=(10, 8))
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        self.render_cache = RenderCache(
+            figsize=(10, 8), on_canvas=lambda canvas: canvas.mpl_connect('draw_event', self.on_draw))
+        self.figure = self.render_cache.figure
+        layout.addWidget(self.render_cache.widget)
 
         # Информационная метка
         self.info_label = QLabel(
@@ -61,71 +78,120 @@ class HeatmapTab(QWidget):
 
         self.setLayout(layout)
 
-    def update_data(self, df):
+    def update_data(self, df, analysis=None):
         self.df = df
+        if analysis is not self.analysis:
+            self.render_cache.clear()
+        self.analysis = analysis or DatasetAnalysis(df)
         if self.df is not None:
             # Получаем только числовые колонки
-            self.numeric_columns = self.df.select_dtypes(include=[np.number]).columns.tolist()
+            self.numeric_columns = self.analysis.numeric_columns
+            self.categorical_columns = self.analysis.categorical_columns
             if self.numeric_columns:
                 self.info_label.setText(
-                    f"Готово к построению. Доступно {len(self.numeric_columns)} числовых переменных")
+                    f"Готово к построению. Доступно {len(self.numeric_columns)} числовых "
+                    f"и {len(self.categorical_columns)} категориальных переменных")
             else:
                 self.info_label.setText("Нет числовых переменных для анализа")
 
+    @profiled()
     def plot_heatmap(self):
         if self.df is None or not self.numeric_columns:
             QMessageBox.warning(self, "Ошибка", "Нет данных для построения тепловой карты")
             return
 
         try:
-            # Очищаем предыдущий график
-            self.figure.clear()
-
-            # Вычисляем корреляционную матрицу
-            corr_matrix = self.df[self.numeric_columns].corr()
-
-            # Создаем subplot
-            ax = self.figure.add_subplot(111)
-
-            # Строим тепловую карту
-            sns.heatmap(corr_matrix,
-                        annot=self.annot_check.isChecked(),
-                        fmt=".2f",
-                        cmap=self.cmap_combo.currentText(),
-                        center=0,
-                        square=True,
-                        cbar_kws={"shrink": .8},
-                        ax=ax)
-
-            ax.set_title('Тепловая карта корреляций числовых переменных')
-
-            # Поворачиваем подписи для лучшей читаемости
-            plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
-            plt.setp(ax.get_yticklabels(), rotation=0)
-
-            self.figure.tight_layout()
-            self.canvas.draw()
-
-            # Находим самые сильные корреляции
-            corr_pairs = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i + 1, len(corr_matrix.columns)):
-                    corr_pairs.append({
-                        'vars': (corr_matrix.columns[i], corr_matrix.columns[j]),
-                        'value': corr_matrix.iloc[i, j]
-                    })
-
-            # Сортируем по абсолютному значению корреляции
-            corr_pairs.sort(key=lambda x: abs(x['value']), reverse=True)
-
-            info_text = f"Тепловая карта построена. Самые сильные корреляции:\n"
-            for pair in corr_pairs[:3]:
-                var1, var2 = pair['vars']
-                value = pair['value']
-                info_text += f"• {var1} & {var2}: {value:.3f}\n"
+            # Вычисляем корреляционную матрицу (кэшируется в DatasetAnalysis)
+            method = self.method_combo.currentData()
+            result = self.analysis.correlation(method)
+            mixed = self.categorical_check.isChecked() and bool(self.categorical_columns)
+
+            # Схема и подписи в ключ не входят - они меняются на готовой карте
+            key = (self.analysis.version, method, mixed)
+            if self.render_cache.restore(key) is not None:
+                self.figure = self.render_cache.figure
+                self.update_style()
+            else:
+                self.build_heatmap(key, method, mixed)
+
+            # Находим самые сильные корреляции и их 95% доверительные интервалы
+            info_text = f"Тепловая карта построена ({METHOD_NAMES[method]}"
+            if result.sample_size:
+                info_text += f", выборка {result.sample_size} строк"
+            info_text += "). Самые сильные корреляции:\n"
+            for var1, var2, value in self.analysis.top_correlations(3, method, categorical=mixed):
+                info_text += f"• {var1} & {var2}: {value:.3f}"
+                if var1 in self.numeric_columns and var2 in self.numeric_columns:
+                    low, high = interval(result, var1, var2)
+                    info_text += f" [95% ДИ {low:.3f}; {high:.3f}]"
+                info_text += "\n"
 
             self.info_label.setText(info_text)
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось построить тепловую карту: {str(e)}")
-            self.info_label.setText(f"Ошибка: {str(e)}")
\ No newline at end of file
+            self.info_label.setText(f"Ошибка: {str(e)}")
+
+    def build_heatmap(self, key, method, mixed):
+        self.figure = self.render_cache.new_figure()
+        ax = self.figure.add_subplot(111)
+
+        # Подписи строятся всегда, а флажок только скрывает их - так
+        # переключение не требует перестроения
+        matrix = self.analysis.association(method) if mixed else self.analysis.corr(method)
+        mesh = draw_heatmap(ax, matrix,
+                            cmap=self.cmap_combo.currentText(),
+                            annot=True,
+                            method_name=METHOD_NAMES[method],
+                            mixed=mixed)
+        texts = list(ax.texts)
+        for text in texts:
+            text.set_visible(self.annot_check.isChecked())
+        # Ячейки и подписи рисуются поверх сохранённого фона (blitting)
+        for artist in [mesh] + texts:
+            artist.set_animated(True)
+        # Состояние графика в кэше: объекты, которые меняются без перестроения, и фон под ними
+        layer = {'mesh': mesh, 'texts': texts, 'colorbar': mesh.colorbar,
+                 'cmap': self.cmap_combo.currentText(),
+                 'annot': self.annot_check.isChecked(), 'background': None}
+        self.render_cache.store(key, layer)
+
+        self.figure.tight_layout()
+        with timed('HeatmapTab.canvas.draw', rows=len(self.df)):
+            self.figure.canvas.draw()
+
+    def update_style(self):
+        """Схема и подписи меняются на построенной карте: фон + blit"""
+        layer = self.render_cache.state()
+        if layer is None or layer['background'] is None:
+            return
+        cmap = self.cmap_combo.currentText()
+        annot = self.annot_check.isChecked()
+        if (cmap, annot) == (layer['cmap'], layer['annot']):
+            return
+        with timed('HeatmapTab.blit'):
+            if cmap != layer['cmap']:
+                set_heatmap_cmap(layer['mesh'], layer['texts'], cmap)
+            for text in layer['texts']:
+                text.set_visible(annot)
+            layer['cmap'], layer['annot'] = cmap, annot
+            canvas = self.figure.canvas
+            canvas.restore_region(layer['background'])
+            self.draw_layer(self.figure, layer)
+            canvas.blit(self.figure.bbox)
+
+    def draw_layer(self, figure, layer):
+        figure.draw_artist(layer['mesh'])
+        for text in layer['texts']:
+            figure.draw_artist(text)
+        # Шкала не анимирована, но её цвета зависят от схемы - дорисовываем поверх фона
+        figure.draw_artist(layer['colorbar'].ax)
+
+    def on_draw(self, event):
+        # Полная отрисовка (построение, изменение размера) обновляет фон под слоем;
+        # на экран картинку выведет сама отрисовка холста, blit здесь не нужен.
+        # У каждого графика кэша свой холст - слой берём по холсту события
+        layer = self.render_cache.state(event.canvas)
+        if layer is not None:
+            layer['background'] = event.canvas.copy_from_bbox(event.canvas.figure.bbox)
+            self.draw_layer(event.canvas.figure, layer)
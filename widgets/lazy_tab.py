@@ -0,0 +1,40 @@
+import importlib
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtCore import QTimer
+
+from utils.profiling import timed
+
+
+class LazyTab(QWidget):
+    """Заглушка вкладки: модуль настоящей вкладки импортируется при первом показе.
+
+    Модули вкладок тянут pandas, matplotlib, seaborn и т.д., поэтому их
+    загрузка откладывается до момента, когда вкладка действительно нужна -
+    окно приложения появляется без ожидания этих импортов.
+    """
+
+    def __init__(self, module_name, class_name):
+        super().__init__()
+        self.module_name = module_name
+        self.class_name = class_name
+        self.widget = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def load(self):
+        if self.widget is None:
+            with timed(f'LazyTab.load {self.class_name}'):
+                module = importlib.import_module(self.module_name)
+                self.widget = getattr(module, self.class_name)()
+                self.layout().addWidget(self.widget)
+        return self.widget
+
+    def update_data(self, df, analysis=None):
+        self.load().update_data(df, analysis)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.widget is None:
+            # Создаем вкладку после первой отрисовки, чтобы окно не ждало импортов
+            QTimer.singleShot(0, self.load)
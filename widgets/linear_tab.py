@@ -1,19 +1,27 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QComboBox, QPushButton, QMessageBox, QCheckBox)
 from PyQt5.QtCore import Qt
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 import numpy as np
-from scipy import stats
+
+from utils.analysis import DatasetAnalysis
+from utils.profiling import profiled, timed
+from utils.decimate import minmax_decimate
+from utils.histogram import BIN_RULES
+from utils.plots import (draw_density, draw_trend, draw_histogram, draw_category_counts,
+                         DENSITY_THRESHOLD, DENSITY_BINS)
+from widgets.render_cache import RenderCache
 
 
 class LinearTab(QWidget):
     def __init__(self):
         super().__init__()
         self.df = None
+        self.analysis = None
         self.numeric_columns = []
+        self.categorical_columns = []
+        self.line = None  # Линия 'Линейного' графика и полные данные для неё
+        self.line_data = None     # (x, y) линии на холсте - только для текущего графика
+        self.line_columns = None  # (x_var, y_var) линии на холсте
         self.initUI()
 
     def initUI(self):
@@ -59,13 +67,23 @@ class LinearTab(QWidget):
         self.plot_type_combo.addItems(['Точечный', 'Линейный', 'Гистограмма X', 'Гистограмма Y'])
         control_layout2.addWidget(self.plot_type_combo)
 
+        # Интервалы гистограммы: число или правило выбора
+        control_layout2.addWidget(QLabel("Интервалы:"))
+        self.bins_combo = QComboBox()
+        for bins in (30, 50, 100):
+            self.bins_combo.addItem(str(bins), bins)
+        for rule, name in BIN_RULES.items():
+            self.bins_combo.addItem(name, rule)
+        control_layout2.addWidget(self.bins_combo)
+
         control_layout2.addStretch()
         layout.addLayout(control_layout2)
 
-        # Область для графика
-        self.figure = Figure(figsize=(10, 8))
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        # Область для графика: у каждого графика свой холст
+        # с панелью масштабирования и сдвига
+        self.render_cache = RenderCache(figsize=(10, 8), toolbar=True)
+        self.figure = self.render_cache.figure
+        layout.addWidget(self.render_cache.widget)
 
         # Информационная метка
         self.info_label = QLabel("Выберите переменные для осей X и Y")
@@ -75,15 +93,20 @@ class LinearTab(QWidget):
 
         self.setLayout(layout)
 
-    def update_data(self, df):
+    def update_data(self, df, analysis=None):
         self.df = df
+        if analysis is not self.analysis:
+            self.render_cache.clear()
+        self.analysis = analysis or DatasetAnalysis(df)
         if self.df is not None:
             # Получаем только числовые колонки
-            self.numeric_columns = self.df.select_dtypes(include=[np.number]).columns.tolist()
+            self.numeric_columns = self.analysis.numeric_columns
+            # Категориальные колонки - только для гистограмм (столбцы по категориям)
+            self.categorical_columns = self.analysis.categorical_columns
             self.x_combo.clear()
             self.y_combo.clear()
-            self.x_combo.addItems(self.numeric_columns)
-            self.y_combo.addItems(self.numeric_columns)
+            self.x_combo.addItems(self.numeric_columns + self.categorical_columns)
+            self.y_combo.addItems(self.numeric_columns + self.categorical_columns)
 
             if self.numeric_columns:
                 # По умолчанию выбираем carat для X и price для Y (самые интересные для diamonds)
@@ -96,6 +119,7 @@ class LinearTab(QWidget):
             else:
                 self.info_label.setText("Нет числовых переменных для анализа")
 
+    @profiled()
     def plot_linear(self):
         if self.df is None or not self.numeric_columns:
             QMessageBox.warning(self, "Ошибка", "Нет данных для построения графика")
@@ -108,63 +132,132 @@ class LinearTab(QWidget):
         if x_var == y_var and plot_type in ['Точечный', 'Линейный']:
             QMessageBox.warning(self, "Ошибка", "Выберите разные переменные для осей X и Y")
             return
+        if plot_type in ['Точечный', 'Линейный'] and \
+                (x_var in self.categorical_columns or y_var in self.categorical_columns):
+            QMessageBox.warning(self, "Ошибка", "Для этого типа графика выберите числовые переменные")
+            return
+
+        bins = self.bins_combo.currentData()
+        key = (self.analysis.version, x_var, y_var, plot_type, self.trend_check.isChecked(), bins)
+        state = self.render_cache.restore(key)
+        if state is not None:
+            # Тот же график уже строился - показываем сохранённую картинку
+            self.figure = self.render_cache.figure
+            # Данные линии в кэше не хранятся - восстанавливаются при масштабировании
+            self.line, self.line_columns = state['line'], state['line_columns']
+            self.line_data = None
+            self.info_label.setText(state['info'])
+            return
 
         try:
-            # Очищаем предыдущий график
-            self.figure.clear()
+            # Новый график строится на новой фигуре - прежние остаются в кэше
+            self.figure = self.render_cache.new_figure()
+            self.line = None
+            self.line_data = None
+            self.line_columns = None
 
             # Создаем subplot
             ax = self.figure.add_subplot(111)
 
             if plot_type == 'Точечный':
-                # Точечный график
-                ax.scatter(self.df[x_var], self.df[y_var], alpha=0.5, s=10)
+                # Точечный график; для больших данных - карта плотности,
+                # время отрисовки которой не зависит от числа строк
+                if len(self.df) > DENSITY_THRESHOLD:
+                    counts, extent = self.analysis.density_grid(x_var, y_var, bins=DENSITY_BINS)
+                    draw_density(self.figure, ax, counts, extent)
+                else:
+                    ax.scatter(self.df[x_var], self.df[y_var], alpha=0.5, s=10)
                 ax.set_xlabel(x_var)
                 ax.set_ylabel(y_var)
                 ax.set_title(f'Зависимость {y_var} от {x_var}')
 
-                # Добавляем линию тренда если выбрано
+                # Наклон, R² и корреляция - из одной закэшированной регрессии
+                regression = self.analysis.regression(x_var, y_var)
+
+                # Добавляем линию тренда если выбрано (прямой хватает двух точек)
                 if self.trend_check.isChecked():
-                    z = np.polyfit(self.df[x_var], self.df[y_var], 1)
-                    p = np.poly1d(z)
-                    ax.plot(self.df[x_var], p(self.df[x_var]), "r--", alpha=0.8, linewidth=2,
-                            label=f'Тренд (R²={np.corrcoef(self.df[x_var], self.df[y_var])[0, 1] ** 2:.3f})')
-                    ax.legend()
+                    draw_trend(ax, regression)
 
-                # Вычисляем корреляцию
-                correlation = self.df[x_var].corr(self.df[y_var])
-                info_text = f"Корреляция между {x_var} и {y_var}: {correlation:.3f}"
+                info_text = f"Корреляция между {x_var} и {y_var}: {regression.r:.3f}"
+                if len(self.df) > DENSITY_THRESHOLD:
+                    info_text += f" (карта плотности по {len(self.df)} точкам)"
+                if self.trend_check.isChecked():
+                    info_text += (f"\nНаклон: {regression.slope:.4g} ± {regression.slope_stderr:.2g}, "
+                                  f"сдвиг: {regression.intercept:.4g} ± {regression.intercept_stderr:.2g}, "
+                                  f"p = {regression.p_value:.2g}")
 
             elif plot_type == 'Линейный':
-                # Линейный график (сортировка по X)
-                sorted_df = self.df.sort_values(by=x_var)
-                ax.plot(sorted_df[x_var], sorted_df[y_var], 'b-', alpha=0.7)
+                # Линейный график: порядок сортировки по X кэшируется, а линия
+                # прореживается до числа пикселей по ширине
+                self.plot_line(ax, x_var, y_var)
                 ax.set_xlabel(x_var)
                 ax.set_ylabel(y_var)
                 ax.set_title(f'Линейный график: {y_var} от {x_var}')
                 info_text = f"Линейный график: {y_var} от {x_var}"
 
             elif plot_type == 'Гистограмма X':
-                # Гистограмма для X
-                ax.hist(self.df[x_var], bins=30, alpha=0.7, edgecolor='black')
-                ax.set_xlabel(x_var)
-                ax.set_ylabel('Частота')
-                ax.set_title(f'Распределение {x_var}')
-                info_text = f"Гистограмма распределения {x_var}"
+                # Гистограмма для X (частоты берём из кэша DatasetAnalysis)
+                info_text = self.plot_histogram(ax, x_var, bins)
 
             elif plot_type == 'Гистограмма Y':
                 # Гистограмма для Y
-                ax.hist(self.df[y_var], bins=30, alpha=0.7, edgecolor='black')
-                ax.set_xlabel(y_var)
-                ax.set_ylabel('Частота')
-                ax.set_title(f'Распределение {y_var}')
-                info_text = f"Гистограмма распределения {y_var}"
+                info_text = self.plot_histogram(ax, y_var, bins)
 
+            self.render_cache.store(key, {'info': info_text, 'line': self.line,
+                                          'line_columns': self.line_columns})
             self.figure.tight_layout()
-            self.canvas.draw()
+            with timed('LinearTab.canvas.draw', rows=len(self.df)):
+                self.figure.canvas.draw()
 
             self.info_label.setText(info_text)
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось построить график: {str(e)}")
-            self.info_label.setText(f"Ошибка: {str(e)}")
\ No newline at end of file
+            self.info_label.setText(f"Ошибка: {str(e)}")
+
+    def plot_histogram(self, ax, column, bins):
+        if column in self.categorical_columns:
+            counts = self.analysis.category_histogram(column)
+            draw_category_counts(ax, counts)
+            info_text = f"Количество строк по значениям {column}"
+        else:
+            counts, edges = self.analysis.histogram(column, bins=bins)
+            draw_histogram(ax, counts, edges, log=bins == 'log')
+            info_text = f"Гистограмма распределения {column} ({len(counts)} интервалов)"
+        ax.set_xlabel(column)
+        ax.set_title(f'Распределение {column}')
+        return info_text
+
+    def line_values(self, x_var, y_var):
+        """X и Y в порядке возрастания X (по закэшированному порядку) без пропусков X"""
+        order = self.analysis.sort_order(x_var)
+        x = self.df[x_var].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        y = self.df[y_var].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        # Пропуски X после сортировки оказываются в конце - отрезаем их
+        valid = len(x) - np.isnan(x).sum()
+        return x[:valid], y[:valid]
+
+    def plot_line(self, ax, x_var, y_var):
+        x, y = self.line_values(x_var, y_var)
+        if len(x) == 0:
+            return
+
+        self.line_data = (x, y)
+        self.line_columns = (x_var, y_var)
+        self.line, = ax.plot(*minmax_decimate(x, y, x[0], x[-1], self.bucket_count(ax)),
+                             'b-', alpha=0.7)
+        ax.set_xlim(x[0], x[-1])
+        # При масштабировании и сдвиге прореживаем заново для видимого диапазона
+        ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+
+    def bucket_count(self, ax):
+        return max(int(ax.bbox.width), 100)
+
+    def on_xlim_changed(self, ax):
+        if self.line is None or self.line_columns is None:
+            return
+        if self.line_data is None:
+            self.line_data = self.line_values(*self.line_columns)
+        x, y = self.line_data
+        x_min, x_max = ax.get_xlim()
+        self.line.set_data(*minmax_decimate(x, y, x_min, x_max, self.bucket_count(ax)))
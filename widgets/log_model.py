@@ -0,0 +1,100 @@
+from collections import deque
+import logging
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+# Уровни как в модуле logging, чтобы записи без перевода уходили в файл
+LEVEL_NAMES = {
+    logging.DEBUG: "Отладка",
+    logging.INFO: "Информация",
+    logging.WARNING: "Предупреждение",
+    logging.ERROR: "Ошибка",
+}
+
+LEVEL_COLORS = {
+    logging.DEBUG: QColor(128, 128, 128),
+    logging.WARNING: QColor(200, 120, 0),
+    logging.ERROR: QColor(200, 0, 0),
+}
+
+DEFAULT_CAPACITY = 10000
+
+
+class LogModel(QAbstractListModel):
+    """Кольцевой буфер записей лога для QListView.
+
+    Хранится не больше capacity записей (timestamp, level, message) - самые
+    старые вытесняются. Отдельная очередь visible содержит только записи,
+    проходящие фильтр по уровню; так как вытесняются всегда самые старые
+    записи, из начала visible тоже удаляются только первые строки, и вид
+    получает точечные сигналы вставки/удаления вместо полного сброса.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.min_level = logging.DEBUG
+        self.entries = deque(maxlen=capacity)
+        self.visible = deque()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        timestamp, level, message = self.visible[index.row()]
+
+        if role == Qt.DisplayRole:
+            return f"[{timestamp}] {message}"
+        if role == Qt.ForegroundRole:
+            return LEVEL_COLORS.get(level)
+        if role == Qt.ToolTipRole:
+            return LEVEL_NAMES.get(level, str(level))
+        return None
+
+    def append_entries(self, batch):
+        """Добавляет пачку записей одной парой сигналов удаления/вставки"""
+        if not batch:
+            return
+        batch = list(batch)[-self.capacity:]
+
+        # Сколько старых записей вытеснит пачка и сколько из них видно
+        dropped = max(0, len(self.entries) + len(batch) - self.capacity)
+        dropped_visible = sum(1 for i in range(dropped) if self.entries[i][1] >= self.min_level)
+        if dropped_visible:
+            self.beginRemoveRows(QModelIndex(), 0, dropped_visible - 1)
+            for _ in range(dropped_visible):
+                self.visible.popleft()
+            self.endRemoveRows()
+
+        self.entries.extend(batch)
+
+        shown = [entry for entry in batch if entry[1] >= self.min_level]
+        if shown:
+            first = len(self.visible)
+            self.beginInsertRows(QModelIndex(), first, first + len(shown) - 1)
+            self.visible.extend(shown)
+            self.endInsertRows()
+
+    def set_min_level(self, level):
+        self.min_level = level
+        self.beginResetModel()
+        self.visible = deque(entry for entry in self.entries if entry[1] >= level)
+        self.endResetModel()
+
+    def set_capacity(self, capacity):
+        self.capacity = capacity
+        self.beginResetModel()
+        self.entries = deque(self.entries, maxlen=capacity)
+        self.visible = deque(entry for entry in self.entries if entry[1] >= self.min_level)
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries.clear()
+        self.visible.clear()
+        self.endResetModel()
@@ -1,44 +1,250 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, QPushButton, 
-                           QHBoxLayout, QLabel)
-from PyQt5.QtCore import QDateTime
+import logging
+import logging.handlers
+import threading
+from collections import deque
+
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QListView, QPushButton,
+                           QHBoxLayout, QLabel, QTabWidget, QTableWidget,
+                           QTableWidgetItem, QHeaderView, QCheckBox, QFileDialog,
+                           QComboBox, QSpinBox)
+from PyQt5.QtCore import Qt, QDateTime, pyqtSignal
+
+from utils.profiling import recorder
+from widgets.log_model import LogModel, LEVEL_NAMES, DEFAULT_CAPACITY
+
+# Сколько событий производительности держим в таблице
+PERF_TABLE_LIMIT = 5000
+
+# Ротация файла лога: размер одного файла и число старых копий
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
 
 class LogTab(QWidget):
-    def __init__(self):
+    # События замеров могут приходить из фоновых потоков - передаем их через сигнал
+    perf_event = pyqtSignal(object)
+    # Сигнал о том, что в очереди появились новые сообщения
+    flush_requested = pyqtSignal()
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
         super().__init__()
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        self.file_handler = None
+        self.file_logger = logging.getLogger('diamond_analyzer.log_tab')
+        self.file_logger.propagate = False
+        self.log_model = LogModel(capacity, self)
+        # Очередь всегда разбирается в потоке интерфейса, даже если add_log
+        # вызван из рабочего потока; сообщения одной итерации цикла событий
+        # добавляются в модель одной пачкой
+        self.flush_requested.connect(self.flush_pending, Qt.QueuedConnection)
         self.initUI()
-    
+        self.perf_event.connect(self.add_perf_event)
+        recorder.add_listener(self.perf_event.emit)
+
     def initUI(self):
         layout = QVBoxLayout()
-        
+
         # Заголовок
         title = QLabel("Лог действий")
         title.setStyleSheet("font-size: 16pt; font-weight: bold; margin: 10px;")
         layout.addWidget(title)
-        
+
+        self.tabs = QTabWidget()
+
+        # Вкладка сообщений
+        messages_tab = QWidget()
+        messages_layout = QVBoxLayout(messages_tab)
+
         # Кнопки управления
         btn_layout = QHBoxLayout()
-        
+
         clear_btn = QPushButton("Очистить лог")
         clear_btn.clicked.connect(self.clear_log)
         btn_layout.addWidget(clear_btn)
-        
+
+        btn_layout.addWidget(QLabel("Уровень:"))
+        self.level_combo = QComboBox()
+        for level, name in LEVEL_NAMES.items():
+            self.level_combo.addItem(name, level)
+        self.level_combo.setCurrentIndex(self.level_combo.findData(logging.INFO))
+        self.level_combo.currentIndexChanged.connect(self.on_level_changed)
+        btn_layout.addWidget(self.level_combo)
+
+        btn_layout.addWidget(QLabel("Хранить записей:"))
+        self.capacity_spin = QSpinBox()
+        self.capacity_spin.setRange(100, 1000000)
+        self.capacity_spin.setSingleStep(1000)
+        self.capacity_spin.setValue(self.log_model.capacity)
+        self.capacity_spin.editingFinished.connect(self.on_capacity_changed)
+        btn_layout.addWidget(self.capacity_spin)
+
+        self.file_check = QCheckBox("Писать в файл")
+        self.file_check.toggled.connect(self.on_file_toggled)
+        btn_layout.addWidget(self.file_check)
+
         btn_layout.addStretch()
-        layout.addLayout(btn_layout)
-        
-        # Текстовое поле для лога
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        layout.addWidget(self.log_text)
-        
+        messages_layout.addLayout(btn_layout)
+
+        # Список сообщений: рисуются только видимые строки
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QListView.NoEditTriggers)
+        self.log_view.setSelectionMode(QListView.ExtendedSelection)
+        messages_layout.addWidget(self.log_view)
+        self.log_model.set_min_level(logging.INFO)
+
+        # Вкладка замеров производительности
+        perf_tab = QWidget()
+        perf_layout = QVBoxLayout(perf_tab)
+
+        perf_btn_layout = QHBoxLayout()
+
+        self.memory_check = QCheckBox("Замерять память (медленнее)")
+        self.memory_check.toggled.connect(recorder.set_memory_tracing)
+        perf_btn_layout.addWidget(self.memory_check)
+
+        clear_perf_btn = QPushButton("Очистить")
+        clear_perf_btn.clicked.connect(self.clear_perf)
+        perf_btn_layout.addWidget(clear_perf_btn)
+
+        export_json_btn = QPushButton("Экспорт JSON")
+        export_json_btn.clicked.connect(self.export_perf_json)
+        perf_btn_layout.addWidget(export_json_btn)
+
+        export_trace_btn = QPushButton("Экспорт Chrome trace")
+        export_trace_btn.clicked.connect(self.export_perf_trace)
+        perf_btn_layout.addWidget(export_trace_btn)
+
+        perf_btn_layout.addStretch()
+        perf_layout.addLayout(perf_btn_layout)
+
+        # Таблица событий; сортировка - щелчком по заголовку
+        self.perf_table = QTableWidget(0, 5)
+        self.perf_table.setHorizontalHeaderLabels(
+            ["Время", "Операция", "Длительность, мс", "Строк", "Память Python, KB"])
+        # tracemalloc видит только кучу Python и numpy, без буферов C-парсера и pyarrow
+        self.perf_table.horizontalHeaderItem(4).setToolTip(
+            "Пик кучи Python (tracemalloc); память C-парсера CSV и pyarrow не учитывается")
+        self.perf_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.perf_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.perf_table.setSortingEnabled(True)
+        self.perf_table.sortByColumn(0, Qt.AscendingOrder)
+        self.perf_items = deque()  # ячейки времени в порядке добавления - для вытеснения
+        perf_layout.addWidget(self.perf_table)
+
+        self.tabs.addTab(messages_tab, "Сообщения")
+        self.tabs.addTab(perf_tab, "⏱ Производительность")
+        layout.addWidget(self.tabs)
+
         self.setLayout(layout)
-        
+
         # Добавляем первое сообщение
         self.add_log("🚀 Приложение запущено")
-    
-    def add_log(self, message):
+
+    def add_log(self, message, level=logging.INFO):
+        """Можно вызывать из любого потока: запись попадет в очередь"""
         timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-        self.log_text.append(f"[{timestamp}] {message}")
-    
+        with self.pending_lock:
+            self.pending.append((timestamp, level, message))
+            first = len(self.pending) == 1
+        if first:
+            self.flush_requested.emit()
+
+    def flush_pending(self):
+        with self.pending_lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        # Прокручиваем вниз, только если пользователь и так был внизу
+        scrollbar = self.log_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+
+        self.log_model.append_entries(batch)
+        if self.file_handler is not None:
+            for timestamp, level, message in batch:
+                self.file_logger.log(level, message)
+
+        if at_bottom:
+            self.log_view.scrollToBottom()
+
     def clear_log(self):
-        self.log_text.clear()
-        self.add_log("📝 Лог очищен")
\ No newline at end of file
+        self.log_model.clear()
+        self.add_log("📝 Лог очищен")
+
+    def on_level_changed(self):
+        self.log_model.set_min_level(self.level_combo.currentData())
+
+    def on_capacity_changed(self):
+        if self.capacity_spin.value() != self.log_model.capacity:
+            self.log_model.set_capacity(self.capacity_spin.value())
+
+    def on_file_toggled(self, enabled):
+        if enabled:
+            file_path, _ = QFileDialog.getSaveFileName(self, 'Файл лога', 'diamond_analyzer.log',
+                                                       'Log Files (*.log);;All Files (*)')
+            if not file_path:
+                self.file_check.setChecked(False)
+                return
+            self.set_log_file(file_path)
+            self.add_log(f"💾 Лог пишется в {file_path}")
+        else:
+            self.set_log_file(None)
+
+    def set_log_file(self, file_path):
+        """Включает запись лога в файл с ротацией; None - выключает"""
+        if self.file_handler is not None:
+            self.file_logger.removeHandler(self.file_handler)
+            self.file_handler.close()
+            self.file_handler = None
+        if file_path:
+            self.file_handler = logging.handlers.RotatingFileHandler(
+                file_path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+            self.file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+            self.file_logger.addHandler(self.file_handler)
+            self.file_logger.setLevel(logging.DEBUG)
+
+    def add_perf_event(self, event):
+        # Пока вставляем и удаляем строки, сортировка должна быть выключена
+        self.perf_table.setSortingEnabled(False)
+
+        # Вытесняем самый старый замер, а не верхнюю строку текущей сортировки
+        if len(self.perf_items) >= PERF_TABLE_LIMIT:
+            self.perf_table.removeRow(self.perf_items.popleft().row())
+
+        row = self.perf_table.rowCount()
+        self.perf_table.insertRow(row)
+
+        timestamp = QDateTime.fromMSecsSinceEpoch(int(event.wall_time * 1000)).toString("hh:mm:ss.zzz")
+        values = [timestamp, event.name, round(event.duration * 1000, 2), event.rows,
+                  None if event.memory_delta is None else round(event.memory_delta / 1024, 1)]
+        for column, value in enumerate(values):
+            item = QTableWidgetItem()
+            # Числа кладем как данные, а не текст, чтобы сортировка была числовой
+            item.setData(Qt.DisplayRole, value if value is not None else "")
+            self.perf_table.setItem(row, column, item)
+            if column == 0:
+                self.perf_items.append(item)
+
+        self.perf_table.setSortingEnabled(True)
+
+    def clear_perf(self):
+        recorder.clear()
+        self.perf_table.setRowCount(0)
+        self.perf_items.clear()
+
+    def export_perf_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, 'Экспорт замеров', 'perf_events.json',
+                                                   'JSON Files (*.json)')
+        if file_path:
+            recorder.export_json(file_path)
+            self.add_log(f"⏱ Замеры сохранены в {file_path}")
+
+    def export_perf_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, 'Экспорт Chrome trace', 'perf_trace.json',
+                                                   'JSON Files (*.json)')
+        if file_path:
+            recorder.export_chrome_trace(file_path)
+            self.add_log(f"⏱ Трасса сохранена в {file_path} (откройте в chrome://tracing)")
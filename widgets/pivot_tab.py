@@ -0,0 +1,198 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                             QTableView, QHeaderView, QCheckBox, QPushButton, QFileDialog)
+from PyQt5.QtCore import Qt
+import pandas as pd
+
+from utils.analysis import DatasetAnalysis
+from utils.profiling import timed
+from widgets.table_model import ArrayTableModel, format_stat
+
+STAT_NAMES = {
+    'mean': "Среднее",
+    'count': "Количество",
+    'sum': "Сумма",
+    'std': "Ст. отклонение",
+    'min': "Минимум",
+    'max': "Максимум",
+}
+
+NO_COLUMNS = "—"
+ALL_VALUES = "все"
+
+
+def format_count(value):
+    return "N/A" if pd.isna(value) else str(int(value))
+
+
+class PivotTab(QWidget):
+    """Сводные таблицы по категориальным колонкам (cut × color × clarity).
+
+    Все группировки и срезы считаются по агрегатному кубу
+    (DatasetAnalysis.cube()), который строится один раз на набор данных.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.df = None
+        self.analysis = None
+        self.slice_combos = {}
+        self.table = None
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+
+        # Заголовок
+        title = QLabel("Сводная таблица")
+        title.setStyleSheet("font-size: 16pt; font-weight: bold; margin: 10px;")
+        layout.addWidget(title)
+
+        # Панель управления
+        control_layout = QHBoxLayout()
+
+        control_layout.addWidget(QLabel("Строки:"))
+        self.rows_combo = QComboBox()
+        control_layout.addWidget(self.rows_combo)
+
+        control_layout.addWidget(QLabel("Столбцы:"))
+        self.columns_combo = QComboBox()
+        control_layout.addWidget(self.columns_combo)
+
+        control_layout.addWidget(QLabel("Показатель:"))
+        self.measure_combo = QComboBox()
+        control_layout.addWidget(self.measure_combo)
+
+        self.stat_combo = QComboBox()
+        for stat, name in STAT_NAMES.items():
+            self.stat_combo.addItem(name, stat)
+        control_layout.addWidget(self.stat_combo)
+
+        self.margins_check = QCheckBox("Итоги")
+        self.margins_check.setChecked(True)
+        control_layout.addWidget(self.margins_check)
+
+        self.export_btn = QPushButton("Экспорт в CSV")
+        self.export_btn.clicked.connect(self.export_table)
+        control_layout.addWidget(self.export_btn)
+
+        control_layout.addStretch()
+        layout.addLayout(control_layout)
+
+        # Срезы: значения измерений, по которым ограничивается таблица
+        self.slice_layout = QHBoxLayout()
+        layout.addLayout(self.slice_layout)
+
+        self.model = ArrayTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table_view)
+
+        self.info_label = QLabel("Загрузите данные для построения сводной таблицы")
+        self.info_label.setAlignment(Qt.AlignCenter)
+        self.info_label.setStyleSheet("color: gray; font-style: italic; margin: 10px;")
+        layout.addWidget(self.info_label)
+
+        for combo in (self.rows_combo, self.columns_combo, self.measure_combo, self.stat_combo):
+            combo.currentIndexChanged.connect(self.update_table)
+        self.margins_check.toggled.connect(self.update_table)
+
+        self.setLayout(layout)
+
+    def update_data(self, df, analysis=None):
+        self.df = df
+        self.analysis = analysis or DatasetAnalysis(df)
+        if self.df is None:
+            return
+
+        cube = self.analysis.cube()
+        combos = (self.rows_combo, self.columns_combo, self.measure_combo)
+        for combo in combos:
+            combo.blockSignals(True)
+        previous = [combo.currentText() for combo in combos]
+
+        self.rows_combo.clear()
+        self.rows_combo.addItems(cube.dimensions)
+        self.columns_combo.clear()
+        self.columns_combo.addItem(NO_COLUMNS)
+        self.columns_combo.addItems(cube.dimensions)
+        self.measure_combo.clear()
+        self.measure_combo.addItems(cube.measures)
+
+        # Сохраняем выбор пользователя, если такие колонки остались
+        defaults = [cube.dimensions[0] if cube.dimensions else "",
+                    cube.dimensions[1] if len(cube.dimensions) > 1 else NO_COLUMNS,
+                    'price' if 'price' in cube.measures else ""]
+        for combo, text, default in zip(combos, previous, defaults):
+            if combo.findText(text) >= 0:
+                combo.setCurrentText(text)
+            elif combo.findText(default) >= 0:
+                combo.setCurrentText(default)
+            combo.blockSignals(False)
+
+        self.build_slices(cube)
+        self.update_table()
+
+    def build_slices(self, cube):
+        while self.slice_layout.count():
+            item = self.slice_layout.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
+        self.slice_combos = {}
+
+        if cube.dimensions:
+            self.slice_layout.addWidget(QLabel("Срез:"))
+        for dim in cube.dimensions:
+            self.slice_layout.addWidget(QLabel(f"{dim}:"))
+            combo = QComboBox()
+            combo.addItem(ALL_VALUES)
+            for value in cube.categories[dim]:
+                combo.addItem(str(value), value)
+            combo.currentIndexChanged.connect(self.update_table)
+            self.slice_layout.addWidget(combo)
+            self.slice_combos[dim] = combo
+        self.slice_layout.addStretch()
+
+    def update_table(self):
+        if self.analysis is None or not self.rows_combo.currentText() or not self.measure_combo.currentText():
+            return
+
+        rows = self.rows_combo.currentText()
+        columns = self.columns_combo.currentText()
+        columns = None if columns in (NO_COLUMNS, rows) else columns
+        stat = self.stat_combo.currentData()
+        selection = {dim: [combo.currentData()] for dim, combo in self.slice_combos.items()
+                     if combo.currentIndex() > 0}
+
+        try:
+            with timed('PivotTab.rollup') as info:
+                cube = self.analysis.cube()
+                self.table = cube.rollup(self.measure_combo.currentText(), stat, rows, columns,
+                                         selection, margins=self.margins_check.isChecked())
+                info['rows'] = cube.rows
+        except Exception as e:
+            self.model.clear()
+            self.info_label.setText(f"Ошибка: {str(e)}")
+            return
+
+        formatter = format_count if stat == 'count' else format_stat
+        self.model.set_frame(self.table, formatter=formatter, show_index=True)
+
+        sliced = ", ".join(f"{dim} = {values[0]}" for dim, values in selection.items())
+        self.info_label.setText(
+            f"{STAT_NAMES[stat]} {self.measure_combo.currentText()} по {rows}"
+            + (f" и {columns}" if columns else "")
+            + (f" (срез: {sliced})" if sliced else "")
+            + f" - {cube.rows} строк")
+
+    def export_table(self):
+        if self.table is None:
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, 'Экспорт сводной таблицы', 'pivot.csv',
+                                                   'CSV Files (*.csv)')
+        if file_path:
+            try:
+                self.table.to_csv(file_path)
+                self.info_label.setText(f"✅ Таблица экспортирована в {file_path}")
+            except Exception as e:
+                self.info_label.setText(f"❌ Ошибка экспорта: {str(e)}")
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QStackedWidget, QWidget, QVBoxLayout
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.figure import Figure
+
+RENDER_CACHE_SIZE = 8
+
+
+class _Page(QWidget):
+    """Страница кэша: фигура на собственном холсте и (по желанию) панель инструментов"""
+
+    def __init__(self, figsize, toolbar):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.canvas = FigureCanvas(Figure(figsize=figsize))
+        self.toolbar = NavigationToolbar(self.canvas, self) if toolbar else None
+        if self.toolbar is not None:
+            layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+
+
+class RenderCache:
+    """Кэш готовых графиков вкладки.
+
+    Каждый график строится на своей фигуре с собственным холстом
+    (FigureCanvas), холсты - страницы QStackedWidget (widget добавляет в
+    себя вкладка). Для каждого ключа (версия данных и параметры графика)
+    хранится страница с уже отрисованной картинкой: повторный выбор тех же
+    параметров просто показывает её, без построения и отрисовки. Фигура при
+    этом остаётся настоящей, поэтому масштабирование, изменение размера окна
+    и правки объектов на месте работают как обычно. Холсты не подменяют
+    друг другу фигуры, так что обходимся открытым API matplotlib.
+    """
+
+    def __init__(self, figsize=(10, 8), toolbar=False, on_canvas=None, capacity=RENDER_CACHE_SIZE):
+        self.widget = QStackedWidget()
+        self.figsize = figsize
+        self.toolbar = toolbar
+        self.on_canvas = on_canvas  # on_canvas(холст) - подключение обработчиков нового холста
+        self.capacity = capacity
+        self.entries = OrderedDict()  # ключ -> [страница, состояние вкладки]
+        self.new_figure()
+
+    @property
+    def canvas(self):
+        """Холст графика, который сейчас показан"""
+        return self.widget.currentWidget().canvas
+
+    @property
+    def figure(self):
+        return self.canvas.figure
+
+    def new_figure(self):
+        """Пустая фигура на новом холсте, показанная вместо текущей"""
+        page = _Page(self.figsize, self.toolbar)
+        if self.on_canvas is not None:
+            self.on_canvas(page.canvas)
+        self._show(page)
+        return page.canvas.figure
+
+    def restore(self, key):
+        """Показывает сохранённый график; возвращает состояние вкладки или None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        self._show(entry[0])
+        return entry[1]
+
+    def store(self, key, state=None):
+        """Запоминает показанный график под ключом"""
+        self.entries[key] = [self.widget.currentWidget(), {} if state is None else state]
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            page, _ = self.entries.popitem(last=False)[1]
+            self._remove(page)
+
+    def state(self, canvas=None):
+        """Состояние вкладки для графика на холсте canvas (по умолчанию - показанном)"""
+        canvas = canvas or self.canvas
+        for page, state in self.entries.values():
+            if page.canvas is canvas:
+                return state
+        return None
+
+    def clear(self):
+        # Показанный график остаётся на экране до следующего построения
+        pages = [page for page, _ in self.entries.values()]
+        self.entries.clear()
+        for page in pages:
+            self._remove(page)
+
+    def _cached(self, page):
+        return any(entry[0] is page for entry in self.entries.values())
+
+    def _show(self, page):
+        previous = self.widget.currentWidget()
+        if page is previous:
+            return
+        if self.widget.indexOf(page) < 0:
+            self.widget.addWidget(page)
+        self.widget.setCurrentWidget(page)
+        # Скрытый график не из кэша больше не понадобится
+        if previous is not None:
+            self._remove(previous)
+
+    def _remove(self, page):
+        """Удаляет страницу, если она не показана и не хранится в кэше"""
+        if page is not self.widget.currentWidget() and not self._cached(page):
+            self.widget.removeWidget(page)
+            page.deleteLater()
@@ -1,15 +1,32 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                             QComboBox, QTableWidget, QTableWidgetItem,
-                             QPushButton, QHeaderView, QTabWidget, QTextEdit)
-from PyQt5.QtCore import Qt
+                             QTableView, QPushButton, QHeaderView,
+                             QTabWidget, QTextEdit, QCheckBox)
 import pandas as pd
 import numpy as np
 
+from utils.analysis import DatasetAnalysis
+from utils.profiling import profiled
+from widgets.table_model import ArrayTableModel, format_stat
+
+
+# С этого числа строк уникальные значения по умолчанию считаются приближённо
+APPROX_UNIQUE_ROWS = 5_000_000
+
+
+def format_values(values):
+    # str() у numpy-скаляров не тащит в вывод np.float32(...) и лишние знаки
+    # (Index при переборе отдаёт float64 - поэтому идём по массиву)
+    return "[" + ", ".join(str(v) for v in np.asarray(values)) + "]"
+
 
 class StatTab(QWidget):
     def __init__(self):
         super().__init__()
         self.df = None
+        self.analysis = None
+        self.streaming_stats = None  # Результат потокового подсчёта для больших файлов
+        self.streaming_file = None
+        self.stale_sections = set()  # Разделы, которые пересчитаются при показе
         self.initUI()
 
     def initUI(self):
@@ -40,7 +57,10 @@ class StatTab(QWidget):
         # Вкладка основной статистики
         self.stats_tab = QWidget()
         stats_layout = QVBoxLayout(self.stats_tab)
-        self.stats_table = QTableWidget()
+        self.stats_model = ArrayTableModel(self)
+        self.stats_table = QTableView()
+        self.stats_table.setModel(self.stats_model)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         stats_layout.addWidget(self.stats_table)
 
         # Вкладка информации о данных
@@ -53,139 +73,225 @@ class StatTab(QWidget):
         # Вкладка пропущенных значений
         self.missing_tab = QWidget()
         missing_layout = QVBoxLayout(self.missing_tab)
-        self.missing_table = QTableWidget()
+        self.missing_model = ArrayTableModel(self)
+        self.missing_table = QTableView()
+        self.missing_table.setModel(self.missing_model)
+        self.missing_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         missing_layout.addWidget(self.missing_table)
 
         # Вкладка уникальных значений
         self.unique_tab = QWidget()
         unique_layout = QVBoxLayout(self.unique_tab)
+        self.approx_check = QCheckBox("Приближённый подсчёт (HyperLogLog и частые значения, постоянная память)")
+        self.approx_check.toggled.connect(self.on_approx_toggled)
+        unique_layout.addWidget(self.approx_check)
         self.unique_text = QTextEdit()
         self.unique_text.setReadOnly(True)
         unique_layout.addWidget(self.unique_text)
 
+        # Вкладка просмотра исходных строк (виртуализированная таблица)
+        self.data_tab = QWidget()
+        data_layout = QVBoxLayout(self.data_tab)
+        self.data_model = ArrayTableModel(self)
+        self.data_table = QTableView()
+        self.data_table.setModel(self.data_model)
+        # Фиксированная высота строк - без измерения каждой строки
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.verticalHeader().setDefaultSectionSize(22)
+        data_layout.addWidget(self.data_table)
+
         self.tabs.addTab(self.stats_tab, "📈 Основная статистика")
         self.tabs.addTab(self.info_tab, "ℹ️ Информация о данных")
         self.tabs.addTab(self.missing_tab, "❓ Пропущенные значения")
         self.tabs.addTab(self.unique_tab, "🔍 Уникальные значения")
+        self.tabs.addTab(self.data_tab, "📄 Данные")
+        self.tabs.currentChanged.connect(self.on_section_changed)
 
         layout.addWidget(self.tabs)
 
         self.setLayout(layout)
 
-    def update_data(self, df):
+    def update_data(self, df, analysis=None):
+        first = self.df is None
         self.df = df
+        self.analysis = analysis or DatasetAnalysis(df)
+        if first:
+            # Вкладка создана уже после загрузки - флажок по размеру всего набора
+            self.reset_approx(len((self.analysis.parent or self.analysis).df))
+        self.streaming_stats = None
+        self.update_stats()
+
+    def reset_approx(self, rows):
+        """Приближённый подсчёт по умолчанию включён только для больших наборов"""
+        self.approx_check.blockSignals(True)
+        self.approx_check.setChecked(rows >= APPROX_UNIQUE_ROWS)
+        self.approx_check.blockSignals(False)
+
+    def show_streaming_stats(self, stats, file_name):
+        """Показывает статистику, посчитанную потоково (без загрузки файла в память)"""
+        self.streaming_stats = stats
+        self.streaming_file = file_name
         self.update_stats()
 
     def update_stats(self):
-        if self.df is not None:
+        if self.streaming_stats is not None:
+            self.stale_sections = set()
             try:
-                self.update_basic_stats()
-                self.update_info()
-                self.update_missing()
-                self.update_unique()
+                self.update_streaming()
             except Exception as e:
                 print(f"Ошибка обновления статистики: {e}")
-
+        elif self.df is not None:
+            # Считаем только видимый раздел, остальные - при переключении на них
+            self.stale_sections = {self.stats_tab, self.info_tab, self.missing_tab,
+                                   self.unique_tab, self.data_tab}
+            self.refresh_section(self.tabs.currentWidget())
+
+    def on_section_changed(self, index):
+        self.refresh_section(self.tabs.widget(index))
+
+    def refresh_section(self, section):
+        if section not in self.stale_sections:
+            return
+        self.stale_sections.discard(section)
+
+        updaters = {
+            self.stats_tab: self.update_basic_stats,
+            self.info_tab: self.update_info,
+            self.missing_tab: self.update_missing,
+            self.unique_tab: self.update_unique,
+            self.data_tab: self.update_preview,
+        }
+        try:
+            updaters[section]()
+        except Exception as e:
+            print(f"Ошибка обновления статистики: {e}")
+
+    @profiled()
     def update_basic_stats(self):
-        # Получаем статистику для числовых колонок
-        numeric_stats = self.df.describe(include=[np.number])
-
-        # Добавляем медиану и моду для категориальных
-        categorical_stats = self.df.describe(include=['object'])
-
-        # Объединяем статистики
-        stats = pd.concat([numeric_stats, categorical_stats], axis=1)
-
-        # Настраиваем таблицу
-        self.stats_table.setRowCount(stats.shape[0])
-        self.stats_table.setColumnCount(stats.shape[1])
-
-        # Заголовки столбцов
-        self.stats_table.setHorizontalHeaderLabels(stats.columns)
-
-        # Заголовки строк
-        self.stats_table.setVerticalHeaderLabels(stats.index)
-
-        # Заполняем данные
-        for i in range(stats.shape[0]):
-            for j in range(stats.shape[1]):
-                value = stats.iloc[i, j]
-                if pd.isna(value):
-                    item = QTableWidgetItem("N/A")
-                else:
-                    if isinstance(value, (int, float)):
-                        display_value = f"{value:.2f}" if abs(value) >= 0.01 else f"{value:.4f}"
-                    else:
-                        display_value = str(value)
-                    item = QTableWidgetItem(display_value)
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                self.stats_table.setItem(i, j, item)
-
-        # Автоматическое растягивание столбцов
-        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
+        # Статистика числовых и категориальных колонок (кэшируется в DatasetAnalysis)
+        self.fill_stats_table(self.analysis.describe())
+
+    def fill_stats_table(self, stats):
+        # Приближённые строки (квартили по скетчу) помечаем в заголовке
+        approximate = stats.attrs.get('approximate', [])
+        if approximate:
+            stats = stats.rename(index={row: f"≈ {row}" for row in approximate})
+        # Модель хранит таблицу целиком, текст ячеек формируется при отрисовке
+        self.stats_model.set_frame(stats, formatter=format_stat, show_index=True)
+
+    @profiled()
     def update_info(self):
         info_text = f"📊 ОБЩАЯ ИНФОРМАЦИЯ О ДАННЫХ\n\n"
         info_text += f"• Размер данных: {self.df.shape[0]} строк, {self.df.shape[1]} столбцов\n"
         info_text += f"• Объем памяти: {self.df.memory_usage(deep=True).sum() / 1024:.1f} KB\n\n"
+        info_text += self.format_dtypes(self.df.dtypes)
+        self.info_text.setText(info_text)
 
-        info_text += "📋 ТИПЫ ДАННЫХ:\n"
-        dtype_counts = self.df.dtypes.value_counts()
+    def format_dtypes(self, dtypes):
+        info_text = "📋 ТИПЫ ДАННЫХ:\n"
+        dtype_counts = dtypes.astype(str).value_counts()
         for dtype, count in dtype_counts.items():
             info_text += f"• {dtype}: {count} колонок\n"
 
         info_text += "\n🔢 ДЕТАЛИ ПО КОЛОНКАМ:\n"
-        for col in self.df.columns:
-            info_text += f"• {col}: {self.df[col].dtype}\n"
-
-        self.info_text.setText(info_text)
+        for col, dtype in dtypes.items():
+            info_text += f"• {col}: {dtype}\n"
+        return info_text
 
+    @profiled()
     def update_missing(self):
-        # Считаем пропущенные значения
-        missing = self.df.isnull().sum()
-        missing_percent = (missing / len(self.df)) * 100
+        # Пропуски считаются в DatasetAnalysis (и дополняются при дописывании строк)
+        self.fill_missing_table(self.analysis.missing_counts(), len(self.df))
 
-        # Создаем таблицу
-        self.missing_table.setRowCount(len(missing))
-        self.missing_table.setColumnCount(3)
-        self.missing_table.setHorizontalHeaderLabels(["Колонка", "Пропущено", "%"])
+    def fill_missing_table(self, missing, rows):
+        missing_percent = (missing / max(rows, 1)) * 100
+        table = pd.DataFrame({"Колонка": missing.index.astype(str),
+                              "Пропущено": missing.to_numpy(),
+                              "%": missing_percent.to_numpy()})
 
-        # Заполняем данные
-        for i, (col, count) in enumerate(missing.items()):
-            self.missing_table.setItem(i, 0, QTableWidgetItem(col))
-            self.missing_table.setItem(i, 1, QTableWidgetItem(str(count)))
-            self.missing_table.setItem(i, 2, QTableWidgetItem(f"{missing_percent[col]:.2f}%"))
+        # Подсветка проблемных колонок (более 5% пропусков)
+        self.missing_model.set_frame(table,
+                                     formatters={2: lambda value: f"{value:.2f}%"},
+                                     highlight=table["%"].to_numpy() > 5)
 
-        self.missing_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-        # Подсветка проблемных колонок
-        for i in range(len(missing)):
-            if missing_percent.iloc[i] > 5:  # Более 5% пропусков
-                for j in range(3):
-                    if self.missing_table.item(i, j):
-                        self.missing_table.item(i, j).setBackground(Qt.yellow)
+    def on_approx_toggled(self):
+        if self.streaming_stats is None and self.df is not None:
+            self.update_unique()
 
+    @profiled()
     def update_unique(self):
         unique_text = "🎯 УНИКАЛЬНЫЕ ЗНАЧЕНИЯ ПО КОЛОНКАМ:\n\n"
+        approx = self.approx_check.isChecked()
 
         for col in self.df.columns:
-            unique_count = self.df[col].nunique()
-            unique_text += f"• {col}: {unique_count} уникальных значений"
-
-            if unique_count <= 10:  # Показываем значения если их немного
-                unique_values = self.df[col].unique()
-                unique_text += f" → {list(unique_values)}\n"
+            # Категориальные колонки считаются точно всегда - это подсчёт по кодам
+            if approx and not isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                unique_text += self.format_approx_unique(col, *self.analysis.distinct_sketch(col),
+                                                         dtype=self.df[col].dtype)
             else:
-                unique_text += f" (первые 5: {list(self.df[col].unique()[:5])}...)\n"
+                # Один value_counts на колонку; при дописывании строк он только дополняется
+                unique_text += self.format_exact_unique(col, self.analysis.value_counts(col))
+
+        self.unique_text.setText(unique_text)
+
+    def format_exact_unique(self, col, counts):
+        counts = counts[counts > 0]
+        unique_text = f"• {col}: {len(counts)} уникальных значений (точно)"
+        if len(counts) <= 10:  # Показываем значения если их немного
+            return unique_text + f" → {format_values(counts.index)}\n"
+        return unique_text + f" (самые частые: {format_values(counts.index[:5])}...)\n"
+
+    def format_approx_unique(self, col, distinct, heavy, dtype=None):
+        top = heavy.top(5)
+        values = np.asarray(top.index)
+        # Сводка хранит значения во float64 - возвращаем тип колонки для вывода
+        if dtype is not None and pd.api.types.is_numeric_dtype(dtype):
+            values = values.astype(dtype)
+        values = ", ".join(f"{str(value)} (≈{int(count)})"
+                           for value, count in zip(values, top['count']))
+        return (f"• {col}: ≈{distinct.estimate()} уникальных значений "
+                f"(приближённо, ±{distinct.relative_error:.1%}); "
+                f"частые: [{values}]\n")
+
+    @profiled()
+    def update_preview(self):
+        self.data_model.set_frame(self.df, show_index=True)
+
+    @profiled()
+    def update_streaming(self):
+        stats = self.streaming_stats
+        self.data_model.clear()
+        self.fill_stats_table(stats.describe())
+        self.fill_missing_table(stats.missing_counts(), stats.rows)
+
+        info_text = f"📊 ОБЩАЯ ИНФОРМАЦИЯ О ДАННЫХ (потоковый режим)\n\n"
+        info_text += f"• Файл: {self.streaming_file}\n"
+        info_text += f"• Размер данных: {stats.rows} строк, {len(stats.columns)} столбцов\n"
+        info_text += "• Данные не загружались в память целиком, квантили и уникальные значения числовых колонок приближённые\n\n"
+        info_text += self.format_dtypes(pd.Series(stats.dtypes))
+        self.info_text.setText(info_text)
 
+        unique_text = "🎯 УНИКАЛЬНЫЕ ЗНАЧЕНИЯ ПО КОЛОНКАМ:\n\n"
+        for col in stats.columns:
+            if col in stats.frequencies:
+                counts = stats.frequencies[col].sort_values(ascending=False)
+                unique_text += self.format_exact_unique(col, counts)
+            elif col in stats.distinct:
+                unique_text += self.format_approx_unique(col, stats.distinct[col], stats.heavy[col],
+                                                         dtype=stats.dtypes.get(col))
         self.unique_text.setText(unique_text)
 
     def export_stats(self):
-        if self.df is not None:
+        if self.streaming_stats is not None:
+            try:
+                self.streaming_stats.describe().to_csv('diamond_statistics.csv')
+                self.info_text.append("\n✅ Статистика экспортирована в diamond_statistics.csv")
+            except Exception as e:
+                self.info_text.append(f"\n❌ Ошибка экспорта: {str(e)}")
+        elif self.df is not None:
             try:
-                # Экспортируем основную статистику
-                stats = self.df.describe(include='all')
-                stats.to_csv('diamond_statistics.csv')
+                # Экспортируем ту же статистику, что в таблице (в float64)
+                self.analysis.describe().to_csv('diamond_statistics.csv')
                 self.info_text.append("\n✅ Статистика экспортирована в diamond_statistics.csv")
             except Exception as e:
                 self.info_text.append(f"\n❌ Ошибка экспорта: {str(e)}")
\ No newline at end of file
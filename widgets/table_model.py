@@ -0,0 +1,109 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+import numpy as np
+import pandas as pd
+
+
+def format_value(value):
+    if pd.isna(value):
+        return "N/A"
+    return str(value)
+
+
+def format_stat(value):
+    """Формат чисел как в таблице основной статистики"""
+    if pd.isna(value):
+        return "N/A"
+    if isinstance(value, (int, float, np.number)):
+        return f"{value:.2f}" if abs(value) >= 0.01 else f"{value:.4f}"
+    return str(value)
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """Табличная модель поверх массивов колонок DataFrame.
+
+    Значения хранятся как NumPy-массивы (категориальные - как коды плюс
+    словарь категорий), а текст ячейки формируется только в data(), то есть
+    только для видимых ячеек. Поэтому QTableView листает даже миллионы строк
+    без создания объектов на каждую ячейку.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = []
+        self._categories = []
+        self._headers = []
+        self._row_labels = None
+        self._rows = 0
+        self._formatters = {}
+        self._default_formatter = format_value
+        self._highlight = None
+
+    def set_frame(self, df, formatter=format_value, formatters=None,
+                  show_index=False, highlight=None):
+        """Загружает DataFrame в модель.
+
+        formatters - словарь {номер колонки: функция} поверх общего formatter,
+        highlight - булев массив строк, которые подсвечиваются желтым.
+        """
+        self.beginResetModel()
+        self._columns = []
+        self._categories = []
+        for col in df.columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self._columns.append(series.cat.codes.to_numpy())
+                self._categories.append(series.cat.categories.to_numpy(dtype=object))
+            elif isinstance(series.dtype, np.dtype):
+                self._columns.append(series.to_numpy())
+                self._categories.append(None)
+            else:
+                # Расширенные типы pandas (строки и т.п.) читаем из Series по требованию
+                self._columns.append(series)
+                self._categories.append(None)
+        self._headers = [str(col) for col in df.columns]
+        self._row_labels = df.index if show_index else None
+        self._rows = len(df)
+        self._default_formatter = formatter
+        self._formatters = formatters or {}
+        self._highlight = None if highlight is None else np.asarray(highlight, dtype=bool)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_frame(pd.DataFrame())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def value(self, row, column):
+        values = self._columns[column]
+        if isinstance(values, pd.Series):
+            return values.iat[row]
+        value = values[row]
+        categories = self._categories[column]
+        if categories is not None:
+            return np.nan if value < 0 else categories[value]
+        return value
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            formatter = self._formatters.get(index.column(), self._default_formatter)
+            return formatter(self.value(index.row(), index.column()))
+        if role == Qt.BackgroundRole and self._highlight is not None:
+            if self._highlight[index.row()]:
+                return QColor(Qt.yellow)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section]
+        if self._row_labels is not None:
+            return str(self._row_labels[section])
+        return str(section + 1)